@@ -0,0 +1,100 @@
+"""
+Synthetic-export parser benchmark.
+
+Generates a Letterboxd-style ratings.csv with N rows and reports rows/s and
+peak memory (tracemalloc) for the original DictReader parser, the current
+parse_csv fast path and the columnar parse_csv_columns output.
+
+    python3 benchmarks/bench_parser.py --rows 100000 --rows 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trakt_sync.parser import parse_csv, parse_csv_columns
+
+
+@dataclass
+class LegacyMovie:
+    title: str
+    year: int
+    uri: str
+    rating: Optional[float] = None
+    watched_at: Optional[str] = None
+
+
+def legacy_parse_csv(filepath, file_type='watchlist'):
+    # The parser as it was before the fast path, kept as the baseline.
+    with open(filepath, 'r', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            if not row.get('Name') or not row.get('Year'):
+                continue
+            movie = LegacyMovie(title=row['Name'], year=int(row['Year']), uri=row['Letterboxd URI'])
+            if file_type == 'ratings':
+                if row.get('Rating'):
+                    movie.rating = float(row['Rating'])
+                if row.get('Date'):
+                    movie.watched_at = row['Date']
+            if file_type == 'watched' and row.get('Date'):
+                movie.watched_at = row['Date']
+            yield movie
+
+
+def write_export(path, rows, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Name", "Year", "Letterboxd URI", "Rating"])
+        for i in range(rows):
+            writer.writerow([
+                f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                f"Synthetic Film {i}",
+                rng.randint(1920, 2025),
+                f"https://boxd.it/{i:x}",
+                rng.choice(["0.5", "1", "1.5", "2", "2.5", "3", "3.5", "4", "4.5", "5"]),
+            ])
+
+
+def measure(label, parse, path, rows):
+    # Timed and traced in separate passes: tracemalloc slows allocation-heavy
+    # code down several times over and would skew the throughput numbers.
+    start = time.perf_counter()
+    result = parse(path)
+    elapsed = time.perf_counter() - start
+    assert len(result) == rows, (label, len(result))
+    del result
+    tracemalloc.start()
+    result = parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"  {label:<22} {rows / elapsed:>12,.0f} rows/s   peak {peak / 2**20:>8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, action="append", help="Rows to generate (repeatable)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows or [100000, 1000000]:
+            path = os.path.join(tmp, "ratings.csv")
+            write_export(path, rows)
+            print(f"{rows:,} rows ({os.path.getsize(path) / 2**20:.1f} MiB):")
+            measure("legacy DictReader", lambda p: list(legacy_parse_csv(p, 'ratings')), path, rows)
+            measure("parse_csv", lambda p: list(parse_csv(p, 'ratings')), path, rows)
+            measure("parse_csv_columns", lambda p: parse_csv_columns(p, 'ratings'), path, rows)
+
+
+if __name__ == "__main__":
+    main()
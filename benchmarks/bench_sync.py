@@ -0,0 +1,185 @@
+"""
+Offline end-to-end sync benchmark against a local fake Trakt server.
+
+Generates a synthetic Letterboxd export, then for each sync mode starts a
+fresh fake server (benchmarks/fake_trakt.py) and drives either TraktAPI
+directly or the full main() CLI against it. Reports items/s, request count,
+429 retries and p50/p95 request latency per mode.
+
+    python3 benchmarks/bench_sync.py --rows 5000 --latency 0.05 --throttle-rate 0.02
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trakt_sync.main as cli
+from trakt_sync.api import TraktAPI
+from trakt_sync.parser import parse_csv
+from trakt_sync.transport import Transport
+
+from benchmarks.fake_trakt import FakeTrakt
+
+# mode -> extra CLI arguments for main(); None drives TraktAPI directly.
+MODES = {
+    "api": None,
+    "sequential": ["--concurrency", "1"],
+    "concurrent": ["--concurrency", "8"],
+    "stream": ["--concurrency", "8", "--stream"],
+    "incremental-rerun": ["--concurrency", "8", "--incremental"],
+}
+
+
+class RecordingTransport(Transport):
+    """Transport that remembers its instances so main()'s traffic can be read back."""
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        RecordingTransport.instances.append(self)
+
+
+def write_export(directory, rows, unmatched=0.01, seed=0):
+    """Writes watchlist.csv, ratings.csv, watched.csv and likes/films.csv."""
+    rng = random.Random(seed)
+    films = []
+    for i in range(rows):
+        name = f"Unmatched Film {i}" if rng.random() < unmatched else f"Synthetic Film {i}"
+        films.append((name, rng.randint(1920, 2025), f"https://boxd.it/{i:x}"))
+
+    def write(name, header, make_row, subset):
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for film in subset:
+                writer.writerow(make_row(film))
+
+    def date():
+        return f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    header = ["Date", "Name", "Year", "Letterboxd URI"]
+    write("watchlist.csv", header, lambda f: [date(), *f], films[: rows // 4])
+    write("watched.csv", header, lambda f: [date(), *f], films)
+    write("ratings.csv", header + ["Rating"],
+          lambda f: [date(), *f, rng.choice(["1", "2.5", "3", "3.5", "4", "5"])], films[: rows // 2])
+    write(os.path.join("likes", "films.csv"), header, lambda f: [date(), *f], films[: rows // 10])
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def run_api(server, data_dir):
+    transport = RecordingTransport()
+    api = TraktAPI("bench-token", "bench-client", transport=transport, base_url=server.url)
+    api.sync_watchlist(list(parse_csv(os.path.join(data_dir, "watchlist.csv"), "watchlist")))
+    api.sync_ratings(list(parse_csv(os.path.join(data_dir, "ratings.csv"), "ratings")))
+    api.sync_history(list(parse_csv(os.path.join(data_dir, "watched.csv"), "watched")))
+    api.sync_likes_to_list(list(parse_csv(os.path.join(data_dir, "likes", "films.csv"), "likes")))
+
+
+def run_main(server, data_dir, extra_args):
+    argv = ["run.py", "--client-id", "bench-client", "--client-secret", "bench-secret",
+            "--data-dir", data_dir, "--sync", "all", "--no-input"] + extra_args
+    saved_argv, saved_url = sys.argv, os.environ.get("TRAKT_API_URL")
+    sys.argv = argv
+    os.environ["TRAKT_API_URL"] = server.url
+    cli.Transport = RecordingTransport
+    try:
+        cli.main()
+    finally:
+        cli.Transport = Transport
+        sys.argv = saved_argv
+        if saved_url is None:
+            os.environ.pop("TRAKT_API_URL", None)
+        else:
+            os.environ["TRAKT_API_URL"] = saved_url
+
+
+def bench_mode(mode, args, data_dir, workdir):
+    server = FakeTrakt(latency=args.latency, throttle_rate=args.throttle_rate,
+                       retry_after=args.retry_after, seed=args.seed).start()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    log = io.StringIO()
+    try:
+        with open("token.json", "w") as f:
+            json.dump({"access_token": "bench-token"}, f)
+        with contextlib.redirect_stdout(log):
+            if mode == "incremental-rerun":
+                # Warm-up import; only the re-run against the now populated
+                # account is measured.
+                run_main(server, data_dir, ["--concurrency", "8"])
+                server.items_received = 0
+                server.throttled = 0
+                server.requests.clear()
+            RecordingTransport.instances = []
+            start = time.perf_counter()
+            if MODES[mode] is None:
+                run_api(server, data_dir)
+            else:
+                run_main(server, data_dir, MODES[mode])
+            elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        server.stop()
+
+    timings = [t for transport in RecordingTransport.instances for t in transport.timings]
+    latencies = [t.total * 1000 for t in timings]
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "items": server.items_received,
+        "items_per_s": server.items_received / elapsed if elapsed else 0.0,
+        "requests": len(timings),
+        "retries": sum(1 for t in timings if t.status == 429),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="Films in the synthetic export")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server latency in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.02, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After sent with injected 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", action="append", choices=list(MODES), help="Modes to run (repeatable)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "letterboxd-bench")
+        write_export(data_dir, args.rows, seed=args.seed)
+        for mode in args.mode or list(MODES):
+            workdir = os.path.join(tmp, mode)
+            os.makedirs(workdir)
+            results.append(bench_mode(mode, args, data_dir, workdir))
+
+    print(f"{'mode':<18} {'seconds':>8} {'items':>7} {'items/s':>9} {'requests':>9} "
+          f"{'retries':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(f"{r['mode']:<18} {r['seconds']:>8.2f} {r['items']:>7} {r['items_per_s']:>9.0f} "
+              f"{r['requests']:>9} {r['retries']:>8} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Local stand-in for the parts of the Trakt API that trakt_sync uses.
+
+Runs a threaded HTTP server on localhost with configurable response latency,
+random 429 injection with Retry-After, X-Ratelimit headers, X-Pagination
+on collection reads and ETags (answering If-None-Match with 304). Any title
+resolves to a deterministic movie except titles starting with "Unmatched",
+which are reported under not_found. A write containing a title starting with
+"Rejected" is answered with 422, and fail_next() simulates an outage.
+
+    from benchmarks.fake_trakt import FakeTrakt
+    with FakeTrakt(latency=0.05, throttle_rate=0.02) as server:
+        api = TraktAPI(token, client_id, base_url=server.url)
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+COLLECTIONS = ("watchlist", "ratings", "history")
+
+
+def movie_for(title: str, year: Optional[int]) -> Dict:
+    trakt_id = zlib.crc32(f"{title}|{year}".encode("utf-8")) % 10**8 + 1
+    return {
+        "title": title,
+        "year": year,
+        "ids": {
+            "trakt": trakt_id,
+            "slug": f"movie-{trakt_id}",
+            "imdb": f"tt{trakt_id:08d}",
+            "tmdb": trakt_id + 7,
+        },
+    }
+
+
+class FakeTrakt:
+    """
+    Args:
+        latency: Seconds added to every response.
+        throttle_rate: Probability that a request is answered with 429.
+        retry_after: Retry-After value sent with injected 429s, in seconds.
+        write_limit: (limit, period) advertised in X-Ratelimit for writes.
+        read_limit: (limit, period) advertised in X-Ratelimit for reads.
+        seed: Seed for the 429 injection.
+    """
+
+    def __init__(self, latency: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 write_limit: Tuple[int, float] = (1000, 1.0), read_limit: Tuple[int, float] = (1000, 1.0),
+                 seed: int = 0, port: int = 0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.write_limit = write_limit
+        self.read_limit = read_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.collections: Dict[str, List[Dict]] = {name: [] for name in COLLECTIONS}
+        self.lists: Dict[int, Dict] = {}
+        self.list_items: Dict[int, List[Dict]] = {}
+        self.next_history_id = 1
+        self.requests = Counter()
+        self.throttled = 0
+        self.not_modified = 0
+        # Statuses the next requests are answered with, see fail_next().
+        self.failures: List[int] = []
+        self.items_received = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTrakt":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeTrakt":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def fail_next(self, count: int, status: int = 503):
+        """Answers the next `count` requests with `status`."""
+        with self.lock:
+            self.failures.extend([status] * count)
+
+    # --- state -----------------------------------------------------------
+
+    def _resolve(self, item: Dict) -> Optional[Dict]:
+        title = item.get("title") or ""
+        if title.startswith("Unmatched"):
+            return None
+        movie = movie_for(title, item.get("year"))
+        ids = item.get("ids") or {}
+        if ids.get("trakt") and ids["trakt"] != movie["ids"]["trakt"]:
+            return None
+        return movie
+
+    def _add(self, name: str, items: List[Dict]) -> Dict:
+        added, existing, not_found = 0, 0, []
+        with self.lock:
+            collection = self.collections[name]
+            present = {entry["movie"]["ids"]["trakt"]: entry for entry in collection}
+            for item in items:
+                movie = self._resolve(item)
+                if movie is None:
+                    not_found.append(item)
+                    continue
+                trakt_id = movie["ids"]["trakt"]
+                if name == "history":
+                    collection.append({
+                        "id": self.next_history_id, "type": "movie", "movie": movie,
+                        "watched_at": item.get("watched_at"),
+                    })
+                    self.next_history_id += 1
+                    added += 1
+                elif trakt_id in present:
+                    if name == "ratings":
+                        present[trakt_id]["rating"] = item.get("rating")
+                    existing += 1
+                else:
+                    entry = {"type": "movie", "movie": movie}
+                    if name == "ratings":
+                        entry["rating"] = item.get("rating")
+                        entry["rated_at"] = item.get("rated_at")
+                    collection.append(entry)
+                    present[trakt_id] = entry
+                    added += 1
+        return {"added": {"movies": added}, "existing": {"movies": existing},
+                "not_found": {"movies": not_found}}
+
+    def _remove(self, entries: List[Dict], body: Dict) -> Tuple[List[Dict], int]:
+        history_ids = set(body.get("ids") or [])
+        movie_ids = {m.get("ids", {}).get("trakt") for m in body.get("movies", [])}
+        kept = [e for e in entries
+                if e.get("id") not in history_ids and e["movie"]["ids"]["trakt"] not in movie_ids]
+        return kept, len(entries) - len(kept)
+
+    def _search(self, query: Dict) -> List[Dict]:
+        title = (query.get("query") or [""])[0]
+        years = (query.get("years") or [None])[0]
+        movie = self._resolve({"title": title, "year": int(years) if years else None})
+        return [{"type": "movie", "score": 1000, "movie": movie}] if movie else []
+
+    # --- HTTP ------------------------------------------------------------
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body=None, headers: Optional[Dict] = None):
+                data = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, str(value))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> Dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+            def _handle(self, method: str):
+                body = self._body() if method in ("POST", "PUT") else {}
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                write = method != "GET"
+                limit, period = fake.write_limit if write else fake.read_limit
+                with fake.lock:
+                    fake.requests[method] += 1
+                    failure = fake.failures.pop(0) if fake.failures else None
+                    throttle = fake.throttle_rate and fake.random.random() < fake.throttle_rate
+                    if throttle:
+                        fake.throttled += 1
+                if failure:
+                    return self._send(failure, {"error": "injected failure"})
+                rejected = [m for m in body.get("movies", []) if str(m.get("title", "")).startswith("Rejected")]
+                if write and rejected:
+                    return self._send(422, {"error": f"invalid items: {len(rejected)}"})
+                if fake.latency:
+                    time.sleep(fake.latency)
+                rate_header = json.dumps({
+                    "name": "AUTHED_API_POST_LIMIT" if write else "AUTHED_API_GET_LIMIT",
+                    "period": period, "limit": limit, "remaining": limit - 1,
+                })
+                if throttle:
+                    return self._send(429, {}, {"Retry-After": fake.retry_after, "X-Ratelimit": rate_header})
+                status, payload, headers = fake.route(method, url.path, query, body)
+                if write and status in (200, 201):
+                    with fake.lock:
+                        fake.items_received += sum(len(v) for v in body.values() if isinstance(v, list))
+                headers["X-Ratelimit"] = rate_header
+                if method == "GET" and status == 200:
+                    etag = '"%s"' % hashlib.sha1(json.dumps(payload).encode("utf-8")).hexdigest()
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        with fake.lock:
+                            fake.not_modified += 1
+                        return self._send(304, None, headers)
+                self._send(status, payload, headers)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+        return Handler
+
+    def _paginate(self, items: List[Dict], query: Dict, default_limit: Optional[int] = None):
+        if "page" not in query and default_limit is None:
+            return 200, items, {}
+        page = int((query.get("page") or ["1"])[0])
+        limit = int((query.get("limit") or [str(default_limit or 10)])[0])
+        page_count = max(1, -(-len(items) // limit))
+        headers = {
+            "X-Pagination-Page": page, "X-Pagination-Limit": limit,
+            "X-Pagination-Page-Count": page_count, "X-Pagination-Item-Count": len(items),
+        }
+        return 200, items[(page - 1) * limit:page * limit], headers
+
+    def route(self, method: str, path: str, query: Dict, body: Dict):
+        parts = [p for p in path.split("/") if p]
+        if method == "GET" and path == "/users/settings":
+            return 200, {"user": {"username": "bench", "ids": {"slug": "bench"}}}, {}
+        if method == "GET" and parts[:1] == ["search"]:
+            return 200, self._search(query), {}
+        if parts[:1] == ["sync"] and len(parts) >= 2 and parts[1] in COLLECTIONS:
+            name = parts[1]
+            if method == "GET":
+                with self.lock:
+                    items = list(self.collections[name])
+                return self._paginate(items, query, 10 if name == "history" else None)
+            if method == "POST" and parts[-1] == "remove":
+                with self.lock:
+                    self.collections[name], deleted = self._remove(self.collections[name], body)
+                return 200, {"deleted": {"movies": deleted}, "not_found": {"movies": []}}, {}
+            if method == "POST":
+                return 201, self._add(name, body.get("movies", [])), {}
+        if parts[:3] == ["users", "me", "lists"]:
+            return self._route_lists(method, parts[3:], query, body)
+        return 404, {"error": f"no route for {method} {path}"}, {}
+
+    def _route_lists(self, method: str, rest: List[str], query: Dict, body: Dict):
+        with self.lock:
+            if not rest:
+                if method == "GET":
+                    return 200, list(self.lists.values()), {}
+                list_id = len(self.lists) + 1
+                self.lists[list_id] = {"name": body.get("name"), "ids": {"trakt": list_id, "slug": f"list-{list_id}"}}
+                self.list_items[list_id] = []
+                return 201, self.lists[list_id], {}
+            list_id = int(rest[0]) if re.fullmatch(r"\d+", rest[0]) else None
+            if list_id not in self.lists:
+                return 404, {}, {}
+            if method == "DELETE" and len(rest) == 1:
+                del self.lists[list_id]
+                del self.list_items[list_id]
+                return 204, None, {}
+            if rest[1:2] == ["items"]:
+                if method == "GET":
+                    return self._paginate(list(self.list_items[list_id]), query)
+                known = {e["movie"]["ids"]["trakt"] for e in self.list_items[list_id]}
+                added, existing, not_found = 0, 0, []
+                for item in body.get("movies", []):
+                    movie = self._resolve(item)
+                    if movie is None:
+                        not_found.append(item)
+                    elif movie["ids"]["trakt"] in known:
+                        existing += 1
+                    else:
+                        self.list_items[list_id].append({"type": "movie", "movie": movie})
+                        known.add(movie["ids"]["trakt"])
+                        added += 1
+                return 201, {"added": {"movies": added}, "existing": {"movies": existing},
+                             "not_found": {"movies": not_found}}, {}
+        return 404, {}, {}
@@ -0,0 +1,22 @@
+import pytest
+
+from benchmarks.fake_trakt import FakeTrakt
+from trakt_sync.api import TraktAPI
+from trakt_sync.ratelimit import RateLimiter
+
+
+@pytest.fixture
+def fake():
+    with FakeTrakt() as server:
+        yield server
+
+
+@pytest.fixture
+def make_api(fake, monkeypatch):
+    """Builds TraktAPI sessions against the fake server, without backoff sleeps."""
+    monkeypatch.setattr("trakt_sync.api.transient_delay", lambda attempt: 0.0)
+
+    def make(**kwargs):
+        limiter = RateLimiter(limits={"write": (1000, 1.0), "read": (1000, 1.0)})
+        return TraktAPI("token", "client-id", base_url=fake.url, rate_limiter=limiter, **kwargs)
+    return make
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from trakt_sync.api import TRANSIENT_RETRIES, TraktUnavailable
+from trakt_sync.deadletter import DeadLetterQueue
+from trakt_sync.journal import Journal
+from trakt_sync.models import Movie
+
+
+def movies(count, rejected=()):
+    return [Movie(f"Rejected {i}" if i in rejected else f"Film {i}", 2000 + i, f"uri-{i}")
+            for i in range(count)]
+
+
+def dead_letters(queue):
+    with open(queue.path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_bisection_isolates_rejected_items(fake, make_api, tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "failed.jsonl"))
+    api = make_api(chunk_size=8, dead_letters=queue)
+
+    api.sync_watchlist(movies(8, rejected={5}))
+
+    assert sorted(e["movie"]["title"] for e in fake.collections["watchlist"]) == \
+        sorted(f"Film {i}" for i in range(8) if i != 5)
+    [entry] = dead_letters(queue)
+    assert entry["item"]["title"] == "Rejected 5"
+    assert entry["status"] == 422
+
+
+def test_transient_failures_are_retried_not_bisected(fake, make_api, tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "failed.jsonl"))
+    api = make_api(chunk_size=100, dead_letters=queue)
+    fake.fail_next(2, status=503)
+
+    api.sync_history(Movie(f"Film {i}", 2000, f"uri-{i}", watched_at="2020-01-01") for i in range(100))
+
+    assert fake.requests["POST"] == 3
+    assert len(fake.collections["history"]) == 100
+    assert queue.added == 0
+
+
+def test_persistent_outage_stops_the_run(fake, make_api, tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "failed.jsonl"))
+    api = make_api(chunk_size=100, dead_letters=queue)
+    fake.fail_next(1000, status=503)
+
+    with pytest.raises(TraktUnavailable):
+        api.sync_history(Movie(f"Film {i}", 2000, f"uri-{i}", watched_at="2020-01-01") for i in range(100))
+
+    assert fake.requests["POST"] == TRANSIENT_RETRIES + 1
+    assert queue.added == 100
+
+
+def test_outage_with_journal_is_left_to_resume(fake, make_api, tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "failed.jsonl"))
+    api = make_api(chunk_size=100, concurrency=4, dead_letters=queue)
+    plays = [Movie(f"Film {i}", 2000, f"uri-{i}", watched_at="2020-01-01") for i in range(1000)]
+    path = str(tmp_path / "journal.jsonl")
+    with Journal(path) as journal:
+        api.sync_history(plays[:300], journal=journal)
+        fake.fail_next(1000, status=503)
+        with pytest.raises(TraktUnavailable):
+            api.sync_history(plays, journal=journal)
+    fake.failures.clear()
+
+    with Journal(path, resume=True) as journal:
+        api.sync_history(plays, journal=journal)
+
+    assert len(fake.collections["history"]) == 1000
+    assert queue.added == 0
+
+
+def test_retry_failed_replays_dead_letters(fake, make_api, tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "failed.jsonl"))
+    api = make_api(chunk_size=10, dead_letters=queue)
+    fake.fail_next(1000, status=503)
+    with pytest.raises(TraktUnavailable):
+        api.sync_watchlist(movies(10))
+    fake.failures.clear()
+
+    assert api.retry_failed() == 10
+    assert len(fake.collections["watchlist"]) == 10
+    assert queue.take() == []
+
+
+def test_reads_retry_server_errors(fake, make_api):
+    api = make_api()
+    api.sync_watchlist(movies(3))
+    fake.fail_next(2)
+
+    assert len(api.get_watchlist()) == 3
+    assert api.retries == 2
+
+
+def test_reads_retry_dropped_connections_then_stop(make_api):
+    api = make_api()
+    # Nothing listens on port 1: every attempt fails to connect.
+    api.base_url = "http://127.0.0.1:1"
+
+    with pytest.raises(TraktUnavailable):
+        api.get_watchlist()
+    assert api.retries == TRANSIENT_RETRIES
+
+
+def test_list_deletion_retries_server_errors(fake, make_api):
+    api = make_api()
+    target = api.find_or_create_list("Favorites")
+    fake.fail_next(2)
+
+    api.delete_list(target["ids"]["trakt"])
+
+    assert fake.lists == {}
+    assert api.retries == 2
+
+
+def test_list_deletion_stops_on_dropped_connections(make_api):
+    api = make_api()
+    api.base_url = "http://127.0.0.1:1"
+
+    with pytest.raises(TraktUnavailable):
+        api.delete_list(1)
@@ -0,0 +1,26 @@
+import json
+import os
+
+from benchmarks.bench_sync import write_export
+from benchmarks.fake_trakt import FakeTrakt
+from trakt_sync.batch import account_argv, print_summary, run_account
+
+
+def test_hung_account_is_killed_after_the_timeout(tmp_path, monkeypatch, capsys):
+    (tmp_path / "alice.json").write_text(json.dumps({"access_token": "token"}))
+    write_export(str(tmp_path / "export"), 20, unmatched=0)
+    account = {"name": "alice", "token": str(tmp_path / "alice.json"), "data_dir": str(tmp_path / "export"),
+               "options": {"client_id": "id", "client_secret": "secret"}}
+    log_dir = str(tmp_path / "logs")
+    os.makedirs(log_dir)
+
+    # Every request takes far longer than the account may run.
+    with FakeTrakt(latency=30) as fake:
+        monkeypatch.setenv("TRAKT_API_URL", fake.url)
+        result = run_account(account, account_argv(account, log_dir), log_dir, timeout=2)
+
+    assert result["exit_code"] == "timeout"
+    assert not result["ok"]
+    assert result["seconds"] < 10
+    print_summary([result], result["seconds"])
+    assert "timeout" in capsys.readouterr().out
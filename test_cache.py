@@ -0,0 +1,88 @@
+import pytest
+
+from trakt_sync.cache import IDCache
+from trakt_sync.models import Movie
+from trakt_sync.payloads import movie_ref
+
+
+def test_caches_sharing_a_file_dont_lock_each_other(tmp_path):
+    path = str(tmp_path / "ids.sqlite")
+    first, second = IDCache(path), IDCache(path)
+    first.db.execute("PRAGMA busy_timeout = 1000")
+    second.db.execute("PRAGMA busy_timeout = 1000")
+
+    first.put("uri-1", {"trakt": 1}, "One", 2001)
+    second.put("uri-2", {"trakt": 2}, "Two", 2002)
+    first.put_not_found("uri-3", "Three", 2003)
+
+    assert second.get("uri-1") == {"trakt": 1}
+    assert first.get("uri-2") == {"trakt": 2}
+    assert second.is_not_found("uri-3")
+    first.close()
+    second.close()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("trakt_sync.cache.time", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = IDCache(str(tmp_path / "ids.sqlite"), ttl=100, negative_ttl=10)
+    cache.put("found", {"trakt": 1})
+    cache.put_not_found("missing")
+
+    clock.now += 50
+    assert cache.get("found") == {"trakt": 1}
+    assert not cache.is_not_found("missing")
+
+    clock.now += 60
+    assert cache.get("found") is None
+    cache.close()
+
+
+def test_prune_evicts_least_recently_used(tmp_path, clock):
+    path = str(tmp_path / "ids.sqlite")
+    cache = IDCache(path, max_entries=2)
+    for trakt, uri in enumerate(("a", "b", "c"), 1):
+        clock.now += 1
+        cache.put(uri, {"trakt": trakt})
+    clock.now += 1
+    assert cache.get("a") == {"trakt": 1}
+    cache.close()
+
+    cache = IDCache(path, max_entries=2)
+    assert cache.get("a") == {"trakt": 1}
+    assert cache.get("b") is None
+    assert cache.get("c") == {"trakt": 3}
+    cache.close()
+
+
+def test_hit_rate_counts_negative_entries_as_misses(tmp_path):
+    cache = IDCache(str(tmp_path / "ids.sqlite"))
+    assert cache.hit_rate == 0.0
+    cache.put("a", {"trakt": 1})
+    cache.put_not_found("b")
+    for uri in ("a", "a", "b", "c"):
+        cache.get(uri)
+    assert (cache.hits, cache.misses, cache.hit_rate) == (2, 2, 0.5)
+    cache.close()
+
+
+def test_payloads_carry_cached_ids(tmp_path):
+    cache = IDCache(str(tmp_path / "ids.sqlite"))
+    cache.put("known", {"trakt": 7, "tmdb": 70, "slug": "known"})
+    known, unknown = cache.annotate([Movie("Known", 2000, "known"), Movie("Unknown", 2001, "unknown")])
+    assert movie_ref(known) == {"title": "Known", "year": 2000, "ids": {"trakt": 7, "tmdb": 70, "slug": "known"}}
+    assert movie_ref(unknown) == {"title": "Unknown", "year": 2001}
+    cache.close()
@@ -0,0 +1,77 @@
+import csv
+
+from benchmarks.fake_trakt import movie_for
+from trakt_sync.catalog import Catalog
+from trakt_sync.diff import RemoteIndex
+
+HEADER = ["Date", "Name", "Year", "Letterboxd URI"]
+
+
+def write_csv(path, rows, header=HEADER):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def write_files(tmp_path):
+    alien = ["Alien", "1979", "https://boxd.it/alien"]
+    heat = ["Heat", "1995", "https://boxd.it/heat"]
+    ran = ["Ran", "1985", "https://boxd.it/ran"]
+    return {
+        "watchlist": write_csv(tmp_path / "watchlist.csv", [["2024-01-01", *heat], ["2024-01-02", *ran]]),
+        "ratings": write_csv(tmp_path / "ratings.csv", [["2024-01-01", *alien, "4"], ["2024-01-03", *alien, "4"]],
+                             HEADER + ["Rating"]),
+        "watched": write_csv(tmp_path / "watched.csv", [
+            ["2024-02-01", *alien], ["2024-02-01", *alien], ["2024-03-01", *alien], ["2024-02-01", *heat],
+        ]),
+        "likes": write_csv(tmp_path / "likes" / "films.csv", [["2024-01-01", *alien], ["2024-01-01", *heat]]),
+    }
+
+
+def test_films_are_shared_across_views_and_looked_up_once(tmp_path):
+    looked_up = []
+
+    def annotate(movies):
+        for movie in movies:
+            looked_up.append(movie.uri)
+            yield movie
+
+    catalog = Catalog(annotate=annotate)
+    views = {sync_type: catalog.load(path, sync_type) for sync_type, path in write_files(tmp_path).items()}
+
+    assert len(catalog) == 3
+    assert sorted(looked_up) == sorted(film.uri for film in catalog.films)
+
+    # The repeated rating and the second 2024-02-01 play are dropped; the
+    # 2024-03-01 rewatch is a play of its own.
+    assert (len(views["ratings"]), views["ratings"].duplicates) == (1, 1)
+    assert (len(views["watched"]), views["watched"].duplicates) == (3, 1)
+    assert [m.watched_at for m in views["watched"]][:2] == ["2024-02-01", "2024-03-01"]
+
+    heat_listed = next(m for m in views["watchlist"] if m.title == "Heat")
+    heat_liked = next(m for m in views["likes"] if m.title == "Heat")
+    assert heat_listed is heat_liked
+    heat_listed.ids = {"trakt": 1}
+    assert next(m for m in views["watched"] if m.title == "Heat").ids == {"trakt": 1}
+
+
+def test_ids_learned_on_rows_reach_the_catalog(tmp_path, make_api):
+    catalog = Catalog()
+    views = {sync_type: catalog.load(path, sync_type) for sync_type, path in write_files(tmp_path).items()}
+    api = make_api()
+
+    rated = list(views["ratings"])
+    api.sync_ratings(rated)
+    remote = RemoteIndex(api.get_ratings())
+    for movie in rated:
+        movie.ids = remote.ids_of(movie)
+    # Rating rows are copies: nothing reaches the catalog until it adopts them.
+    alien = next(m for m in views["likes"] if m.title == "Alien")
+    assert not alien.ids
+
+    catalog.adopt_ids(rated)
+    assert alien.ids == movie_for("Alien", 1979)["ids"]
+    assert all(m.ids == alien.ids for m in views["watched"] if m.title == "Alien")
@@ -0,0 +1,35 @@
+from trakt_sync.clean import clean_account
+from trakt_sync.models import Movie
+
+
+def fill_account(api, count):
+    movies = [Movie(f"Film {i}", 2000 + i % 20, f"https://boxd.it/{i:x}", rating=4.0,
+                    watched_at=f"2024-01-{i % 28 + 1:02d}") for i in range(count)]
+    api.sync_watchlist(movies)
+    api.sync_ratings(movies)
+    api.sync_history(movies)
+    api.sync_likes_to_list(movies[:5], "Favorites")
+
+
+def test_clean_purges_again_until_nothing_is_left(fake, make_api):
+    api = make_api()
+    fill_account(api, 30)
+    assert fake.lists
+
+    # The first history purge only gets through part of the plays, as if
+    # some removals were lost; the recount has to catch the rest.
+    sent = []
+    remove_history = api.remove_history
+
+    def lossy_remove_history(items):
+        items = list(items)
+        sent.append(len(items))
+        return remove_history(items[:10] if len(sent) == 1 else items)
+    api.remove_history = lossy_remove_history
+
+    remaining = clean_account(api, "Favorites", workers=2)
+
+    assert remaining == {"watchlist": 0, "ratings": 0, "history": 0}
+    assert sent == [30, 20]
+    assert all(not items for items in fake.collections.values())
+    assert not fake.lists
@@ -0,0 +1,59 @@
+import functools
+import json
+import sys
+
+import trakt_sync.main as cli
+from benchmarks.bench_sync import write_export
+from trakt_sync.daemon import run_daemon
+from trakt_sync.source import ExportSource
+
+
+def run_daemon_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(cli, "run_daemon", functools.partial(cli.run_daemon, cycles=1))
+    monkeypatch.setattr(sys, "argv", [
+        "run.py", "--client-id", "id", "--client-secret", "secret", "--no-input", "--sync", "watched",
+        "--token-file", str(tmp_path / "token.json"), "--data-dir", str(tmp_path / "export"), "--daemon",
+    ])
+    assert cli.main() == 0
+
+
+def test_daemon_full_reread_does_not_duplicate_plays(fake, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRAKT_API_URL", fake.url)
+    (tmp_path / "token.json").write_text(json.dumps({"access_token": "token"}))
+    write_export(str(tmp_path / "export"), 50, unmatched=0)
+
+    run_daemon_once(monkeypatch, tmp_path)
+    assert len(fake.collections["history"]) == 50
+
+    # An earlier row changes: the watermark no longer matches and the whole
+    # file is read again.
+    watched = tmp_path / "export" / "watched.csv"
+    lines = watched.read_text(encoding="utf-8").splitlines(keepends=True)
+    lines[1] = lines[1].replace("Synthetic Film 0", "Renamed Film 0")
+    watched.write_text("".join(lines), encoding="utf-8")
+
+    run_daemon_once(monkeypatch, tmp_path)
+    assert len(fake.collections["history"]) == 50
+
+
+def test_failed_check_is_retried_next_cycle(monkeypatch, tmp_path):
+    write_export(str(tmp_path / "export"), 20, unmatched=0)
+    files = {"watchlist": ("watchlist.csv", "watchlist"), "watched": ("watched.csv", "history")}
+
+    # watched.csv is still being copied when the first check reads it.
+    fingerprint = ExportSource.fingerprint
+    failures = ["watched.csv"]
+
+    def flaky_fingerprint(self, name):
+        if name in failures:
+            failures.remove(name)
+            raise OSError(f"{name} is incomplete")
+        return fingerprint(self, name)
+    monkeypatch.setattr(ExportSource, "fingerprint", flaky_fingerprint)
+    monkeypatch.setattr("trakt_sync.daemon.time.sleep", lambda seconds: None)
+
+    synced = []
+    run_daemon(lambda export_dir, sync_types: synced.append(sync_types), str(tmp_path / "export"), files,
+               interval=0, cycles=2)
+    assert synced == [["watchlist", "watched"]]
@@ -0,0 +1,43 @@
+from trakt_sync.diff import RemoteIndex, changed_ratings, missing_from_watchlist, new_history_plays
+from trakt_sync.models import Movie
+
+
+def remote(title, year, trakt, **extra):
+    return {"movie": {"title": title, "year": year, "ids": {"trakt": trakt, "slug": title.lower()}}, **extra}
+
+
+def test_watchlist_matches_by_id_and_by_normalized_title():
+    index = RemoteIndex([remote("Alien", 1979, 1), remote("Amélie", 2001, 2)])
+    movies = [
+        Movie("Renamed Locally", 1979, "a", ids={"trakt": 1}),
+        Movie("amélie!", 2001, "b"),
+        Movie("Amélie", 2002, "c"),
+        Movie("Heat", 1995, "d"),
+    ]
+    assert [m.uri for m in missing_from_watchlist(movies, index)] == ["c", "d"]
+
+
+def test_ratings_convert_to_ten_point_scale_and_skip_equal_ones():
+    index = RemoteIndex([remote("Alien", 1979, 1, rating=8), remote("Heat", 1995, 2, rating=6)])
+    movies = [
+        Movie("Alien", 1979, "a", rating=4.0),  # 8 on Trakt already
+        Movie("Heat", 1995, "b", rating=3.5),  # 7, Trakt has 6
+        Movie("Ran", 1985, "c", rating=0.5),  # 1, not rated on Trakt
+        Movie("Brazil", 1985, "d"),  # no rating
+    ]
+    changed = list(changed_ratings(movies, index))
+    assert [m.uri for m in changed] == ["b", "c"]
+    assert [int(m.rating * 2) for m in changed] == [7, 1]
+
+
+def test_history_skips_known_plays_and_repeats_within_the_file():
+    index = RemoteIndex([remote("Alien", 1979, 1, watched_at="2024-01-05T21:00:00.000Z")])
+    movies = [
+        Movie("Alien", 1979, "a", watched_at="2024-01-05"),  # on Trakt for that date
+        Movie("Alien", 1979, "a", watched_at="2024-02-01"),  # a rewatch
+        Movie("Alien", 1979, "a", watched_at="2024-02-01"),  # repeated row
+        Movie("Heat", 1995, "b", watched_at="2024-01-05"),
+        Movie("Heat", 1995, "b"),  # no watch date
+    ]
+    plays = [(m.uri, m.watched_at) for m in new_history_plays(movies, index)]
+    assert plays == [("a", "2024-02-01"), ("b", "2024-01-05")]
@@ -0,0 +1,61 @@
+from trakt_sync.httpcache import ResponseCache
+from trakt_sync.models import Movie
+
+
+def movies(count):
+    return [Movie(f"Film {i}", 2000 + i, f"uri-{i}") for i in range(count)]
+
+
+def test_fresh_reads_are_served_from_the_cache(fake, make_api, tmp_path):
+    cache = ResponseCache(str(tmp_path / "http.sqlite"))
+    api = make_api(http_cache=cache)
+    api.sync_watchlist(movies(3))
+    reads = fake.requests["GET"]
+
+    assert len(api.get_watchlist()) == 3
+    assert len(api.get_watchlist()) == 3
+    assert fake.requests["GET"] == reads + 1
+    assert cache.hits == 1
+
+
+def test_stale_reads_are_revalidated(fake, make_api, tmp_path):
+    cache = ResponseCache(str(tmp_path / "http.sqlite"), ttls={})
+    api = make_api(http_cache=cache)
+    api.sync_watchlist(movies(3))
+
+    assert len(api.get_watchlist()) == 3
+    assert len(api.get_watchlist()) == 3
+    assert fake.not_modified == 1
+    assert cache.revalidated == 1
+
+
+def test_writes_invalidate_what_they_change(fake, make_api, tmp_path):
+    cache = ResponseCache(str(tmp_path / "http.sqlite"))
+    api = make_api(http_cache=cache)
+    api.sync_watchlist(movies(3))
+    api.get_watchlist()
+    api.get_ratings()
+
+    api.sync_watchlist(movies(5))
+    assert len(api.get_watchlist()) == 5
+    # Ratings were not touched by the watchlist write.
+    api.get_ratings()
+    assert cache.hits == 1
+
+    # Watched movies leave the watchlist: history writes drop it too.
+    api.sync_history([Movie("Film 0", 2000, "uri-0", watched_at="2024-01-01T20:00:00.000Z")])
+    hits = cache.hits
+    api.get_watchlist()
+    assert cache.hits == hits
+
+
+def test_cache_is_kept_per_account(fake, make_api, tmp_path):
+    cache = ResponseCache(str(tmp_path / "http.sqlite"))
+    api = make_api(http_cache=cache)
+    api.sync_watchlist(movies(3))
+    api.get_watchlist()
+
+    other = make_api(http_cache=cache)
+    other.cache_scope = "another-account"
+    other.get_watchlist()
+    assert cache.hits == 0
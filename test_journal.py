@@ -0,0 +1,42 @@
+from trakt_sync.journal import Journal, item_fingerprint
+
+ITEMS = [{"title": f"Film {i}", "year": 2000 + i} for i in range(6)]
+
+
+def test_resume_skips_acknowledged_items(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with Journal(path) as journal:
+        payload, fingerprints = journal.pending({"movies": ITEMS[:3]})
+        journal.record("/sync/watchlist", fingerprints)
+
+    with Journal(path, resume=True) as journal:
+        payload, fingerprints = journal.pending({"movies": ITEMS})
+    assert payload["movies"] == ITEMS[3:]
+    assert fingerprints == [item_fingerprint(item) for item in ITEMS[3:]]
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with Journal(path) as journal:
+        journal.record("/sync/watchlist", [item_fingerprint(ITEMS[0])])
+
+    with Journal(path) as journal:
+        assert len(journal) == 0
+        assert journal.pending({"movies": ITEMS})[0]["movies"] == ITEMS
+
+
+def test_torn_last_line_is_dropped_before_appending(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    with Journal(str(path)) as journal:
+        journal.record("/sync/watchlist", [item_fingerprint(ITEMS[0])])
+    # A crash in the middle of writing the next record.
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"endpoint":"/sync/watchlist","items":["ab')
+
+    with Journal(str(path), resume=True) as journal:
+        assert len(journal) == 1
+        journal.record("/sync/watchlist", [item_fingerprint(ITEMS[1])])
+
+    with Journal(str(path), resume=True) as journal:
+        assert len(journal) == 2
+    assert path.read_text(encoding="utf-8").count("\n") == 2
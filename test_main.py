@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.bench_sync import write_export
+from benchmarks.fake_trakt import FakeTrakt
+import trakt_sync.main as cli
+from trakt_sync.api import TraktAPI
+from trakt_sync.main import chunk_size, positive_int
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_chunk_size_is_auto_or_a_positive_number():
+    assert chunk_size("auto") is None
+    assert chunk_size("1") == 1
+    assert chunk_size("250") == 250
+    for value in ("0", "-5", "big"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            chunk_size(value)
+
+
+def test_queue_size_must_be_positive():
+    assert positive_int("1") == 1
+    for value in ("0", "-1", "many"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(value)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGINT")
+def test_ctrl_c_stops_all_phases(tmp_path):
+    write_export(str(tmp_path / "export"), 3000, unmatched=0)
+    (tmp_path / "token.json").write_text(json.dumps({"access_token": "token"}))
+    with FakeTrakt(latency=0.2) as fake:
+        env = dict(os.environ, TRAKT_API_URL=fake.url, PYTHONPATH=ROOT)
+        process = subprocess.Popen(
+            [sys.executable, "-m", "trakt_sync.main", "--client-id", "id", "--client-secret", "secret",
+             "--no-input", "--no-search", "--concurrency", "2", "--token-file", str(tmp_path / "token.json"),
+             "--data-dir", str(tmp_path / "export")],
+            cwd=str(tmp_path), env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + 30
+        while fake.requests["POST"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        sent = fake.requests["POST"]
+        process.send_signal(signal.SIGINT)
+        output = process.communicate(timeout=10)[0].decode()
+
+    assert process.returncode == 130, output
+    assert "--resume" in output
+    # Only the requests already in flight were finished.
+    assert fake.requests["POST"] <= sent + 2
+
+
+def run_main(monkeypatch, tmp_path, *extra):
+    monkeypatch.setattr(sys, "argv", [
+        "run.py", "--client-id", "id", "--client-secret", "secret", "--no-input",
+        "--token-file", str(tmp_path / "token.json"), "--data-dir", str(tmp_path / "export"), *extra,
+    ])
+    return cli.main()
+
+
+def test_failed_likes_list_is_retried_by_the_next_run(fake, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRAKT_API_URL", fake.url)
+    (tmp_path / "token.json").write_text(json.dumps({"access_token": "token"}))
+    write_export(str(tmp_path / "export"), 40, unmatched=0)
+
+    # Trakt refuses to create the list (e.g. a 403).
+    monkeypatch.setattr(TraktAPI, "create_list", lambda self, name: None)
+    assert run_main(monkeypatch, tmp_path, "--sync", "likes", "--new-rows-only") == 1
+    monkeypatch.undo()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRAKT_API_URL", fake.url)
+    assert run_main(monkeypatch, tmp_path, "--sync", "likes", "--new-rows-only") == 0
+    [liked] = fake.lists.values()
+    assert len(fake.list_items[liked["ids"]["trakt"]]) == 4
+
+
+def test_tail_run_does_not_download_the_collection(fake, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRAKT_API_URL", fake.url)
+    (tmp_path / "token.json").write_text(json.dumps({"access_token": "token"}))
+    write_export(str(tmp_path / "export"), 300, unmatched=0)
+    assert run_main(monkeypatch, tmp_path, "--sync", "watched", "--new-rows-only", "--no-http-cache") == 0
+
+    with open(tmp_path / "export" / "watched.csv", "a", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(f"2024-05-0{i + 1},New Film {i},2024,https://boxd.it/new{i}\n")
+    reads = fake.requests["GET"]
+    assert run_main(monkeypatch, tmp_path, "--sync", "watched", "--new-rows-only", "--no-http-cache") == 0
+
+    assert len(fake.collections["history"]) == 305
+    # Only the account lookup.
+    assert fake.requests["GET"] - reads == 1
+
+
+def test_metrics_json_counts_requests_retries_and_items(fake, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRAKT_API_URL", fake.url)
+    monkeypatch.setattr("trakt_sync.api.transient_delay", lambda attempt: 0.0)
+    (tmp_path / "token.json").write_text(json.dumps({"access_token": "token"}))
+    write_export(str(tmp_path / "export"), 40, unmatched=0)
+    fake.fail_next(1, status=503)
+
+    metrics_path = tmp_path / "metrics.json"
+    assert run_main(monkeypatch, tmp_path, "--sync", "all", "--metrics-json", str(metrics_path)) == 0
+
+    metrics = json.loads(metrics_path.read_text())
+    assert sum(metrics["requests"].values()) == sum(fake.requests.values())
+    assert sum(metrics["retries"].values()) == 1
+    assert metrics["items"]["watchlist"]["added.movies"] == 10
+    assert metrics["items"]["ratings"]["added.movies"] == 20
+    assert metrics["items"]["watched"]["added.movies"] == 40
+    assert metrics["latency_ms"]["POST /sync/history"]["count"] == metrics["requests"]["POST /sync/history"]
+    assert set(metrics["phases"]["watched"]) >= {"parse", "send"}
@@ -0,0 +1,39 @@
+from benchmarks.fake_trakt import movie_for
+
+
+def fill_history(fake, count):
+    fake.collections["history"] = [
+        {"id": i, "type": "movie", "movie": movie_for(f"Film {i}", 2000), "watched_at": "2024-01-01T00:00:00.000Z"}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_pages_are_read_forward_and_in_reverse(fake, make_api):
+    fill_history(fake, 25)
+    api = make_api()
+
+    forward = list(api.iter_pages("/sync/history", limit=10))
+    assert [[e["id"] for e in page] for page in forward] == \
+        [list(range(1, 11)), list(range(11, 21)), list(range(21, 26))]
+
+    backward = list(api.iter_pages("/sync/history", limit=10, reverse=True))
+    assert [page[0]["id"] for page in backward] == [21, 11, 1]
+    assert sorted(e["id"] for page in backward for e in page) == list(range(1, 26))
+
+
+def test_large_history_is_not_truncated(fake, make_api):
+    fill_history(fake, 12345)
+    api = make_api()
+
+    assert api.count_items("/sync/history") == 12345
+    ids = [entry["id"] for entry in api.iter_history()]
+    assert ids == list(range(1, 12346))
+    assert len(api.get_history()) == 12345
+    assert len(list(api.iter_history(limit=100, reverse=True))) == 12345
+
+
+def test_single_page_and_empty_collections(fake, make_api):
+    api = make_api()
+    assert list(api.iter_pages("/sync/history")) == []
+    fill_history(fake, 3)
+    assert [len(page) for page in api.iter_pages("/sync/history")] == [3]
@@ -1,9 +1,14 @@
+import csv
+import io
 import os
 import sys
 # Add current directory to path to allow importing trakt_sync
 sys.path.append(os.getcwd())
 
-from trakt_sync.parser import parse_csv
+import pytest
+
+from trakt_sync.models import Movie
+from trakt_sync.parser import parse_csv, parse_csv_columns
 
 def find_data_dir():
     for item in os.listdir('.'):
@@ -59,5 +64,80 @@ def test_parsing():
     else:
         print("likes/films.csv not found")
 
+def dictreader_parse(text, file_type):
+    """
+    The csv.DictReader parser _iter_rows replaced, as the reference. It raised
+    KeyError without a Letterboxd URI column and gave None for short rows;
+    the URI is read with a '' default here, which is what _iter_rows yields.
+    """
+    for row in csv.DictReader(io.StringIO(text)):
+        if not row.get('Name') or not row.get('Year'):
+            continue
+        movie = Movie(title=row['Name'], year=int(row['Year']), uri=row.get('Letterboxd URI') or '')
+        if file_type == 'ratings':
+            if row.get('Rating'):
+                movie.rating = float(row['Rating'])
+            if row.get('Date'):
+                movie.watched_at = row['Date']
+        if file_type == 'watched' and row.get('Date'):
+            movie.watched_at = row['Date']
+        yield movie
+
+
+EXPORTS = {
+    "full": (
+        "Date,Name,Year,Letterboxd URI,Rating\n"
+        "2024-01-01,Alien,1979,https://boxd.it/a,4.5\n"
+        '2024-01-02,"Crouching Tiger, Hidden Dragon",2000,https://boxd.it/b,3\n'
+        "2024-01-03,Heat,1995,https://boxd.it/c,\n"
+    ),
+    "no rating or date": (
+        "Name,Year,Letterboxd URI\n"
+        "Alien,1979,https://boxd.it/a\n"
+    ),
+    "no uri": (
+        "Date,Name,Year,Rating\n"
+        "2024-01-01,Alien,1979,4\n"
+    ),
+    "reordered columns": (
+        "Rating,Letterboxd URI,Year,Name,Date\n"
+        "2,https://boxd.it/a,1979,Alien,2024-01-01\n"
+    ),
+    "short rows": (
+        "Date,Name,Year,Letterboxd URI,Rating\n"
+        "2024-01-01,Alien,1979\n"
+        "2024-01-02,Heat,1995,https://boxd.it/c\n"
+        "2024-01-03,Ran\n"
+    ),
+    "empty name or year": (
+        "Date,Name,Year,Letterboxd URI,Rating\n"
+        "2024-01-01,,1979,https://boxd.it/a,4\n"
+        "2024-01-02,Heat,,https://boxd.it/c,3\n"
+        "2024-01-03,Ran,1985,https://boxd.it/d,5\n"
+    ),
+    "header only": "Date,Name,Year,Letterboxd URI\n",
+}
+
+
+@pytest.mark.parametrize("file_type", ["watchlist", "ratings", "watched", "likes"])
+@pytest.mark.parametrize("export", sorted(EXPORTS))
+def test_rows_match_the_dictreader_parser(tmp_path, export, file_type):
+    path = tmp_path / "export.csv"
+    path.write_text(EXPORTS[export], encoding="utf-8")
+    expected = list(dictreader_parse(EXPORTS[export], file_type))
+
+    assert list(parse_csv(str(path), file_type)) == expected
+    assert list(parse_csv_columns(str(path), file_type)) == expected
+
+
+def test_file_types_keep_only_their_fields(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(EXPORTS["full"], encoding="utf-8")
+    rating, watched, liked = (next(parse_csv(str(path), t)) for t in ("ratings", "watched", "likes"))
+    assert (rating.rating, rating.watched_at) == (4.5, "2024-01-01")
+    assert (watched.rating, watched.watched_at) == (None, "2024-01-01")
+    assert (liked.rating, liked.watched_at) == (None, None)
+
+
 if __name__ == "__main__":
     test_parsing()
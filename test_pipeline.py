@@ -0,0 +1,36 @@
+from trakt_sync.catalog import dedupe
+from trakt_sync.models import Movie
+from trakt_sync.pipeline import Tap, prefetch
+
+
+def films(n):
+    return [Movie(f"Film {i}", 2000, f"uri-{i}") for i in range(n)]
+
+
+def test_tap_keeps_at_most_limit():
+    tap = Tap(iter(films(10)), keep=lambda m: not m.ids, limit=3)
+    assert len(list(tap)) == 10
+    assert [m.title for m in tap.kept] == ["Film 0", "Film 1", "Film 2"]
+    assert tap.overflow == 7
+
+
+def test_dedupe_window_bounds_memory():
+    rows = films(5) + films(5)
+    assert len(list(dedupe(rows, "watchlist"))) == 5
+    # Repeats within the window are dropped, those further apart get through.
+    assert len(list(dedupe(films(2) + films(2), "watchlist", window=2))) == 2
+    assert len(list(dedupe(rows, "watchlist", window=2))) == 10
+
+
+def test_prefetch_preserves_order_and_errors():
+    assert [m.title for m in prefetch(iter(films(50)), maxsize=4)] == [f"Film {i}" for i in range(50)]
+
+    def broken():
+        yield films(1)[0]
+        raise ValueError("bad row")
+    try:
+        list(prefetch(broken()))
+    except ValueError as e:
+        assert str(e) == "bad row"
+    else:
+        raise AssertionError("producer error was swallowed")
@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+from benchmarks.bench_sync import write_export
+from trakt_sync.catalog import Catalog
+from trakt_sync.plan import apply_plan, write_plan
+from trakt_sync.source import ExportSource
+
+FILES = {
+    'watchlist': "watchlist.csv",
+    'ratings': "ratings.csv",
+    'watched': "watched.csv",
+    'likes': "likes/films.csv",
+}
+
+
+def plan(tmp_path, rows=40):
+    write_export(str(tmp_path / "export"), rows, unmatched=0)
+    path = str(tmp_path / "sync.ndjson.gz")
+    with ExportSource(str(tmp_path / "export")) as source:
+        manifest = write_plan(path, source, FILES, Catalog(), list_name="Liked", chunk_size=7)
+    return path, manifest
+
+
+def test_plan_round_trip(fake, make_api, tmp_path):
+    path, manifest = plan(tmp_path)
+    assert {s["sync_type"]: s["items"] for s in manifest["sections"]} == \
+        {'watchlist': 10, 'ratings': 20, 'watched': 40, 'likes': 4}
+
+    results = apply_plan(make_api(), path)
+
+    assert len(fake.collections["watchlist"]) == 10
+    assert len(fake.collections["ratings"]) == 20
+    assert len(fake.collections["history"]) == 40
+    [liked] = fake.lists.values()
+    assert liked["name"] == "Liked"
+    assert len(fake.list_items[liked["ids"]["trakt"]]) == 4
+    assert len(results["watched"]) == 6
+
+
+def test_apply_rejects_a_modified_plan(fake, make_api, tmp_path):
+    path, _ = plan(tmp_path)
+    with gzip.open(path, "rb") as f:
+        lines = f.readlines()
+    lines[0] = lines[0].replace(b"Synthetic", b"Tampered")
+    with gzip.open(path, "wb") as f:
+        f.writelines(lines)
+
+    with pytest.raises(ValueError):
+        apply_plan(make_api(), path)
+    assert not fake.collections["watchlist"]
@@ -0,0 +1,44 @@
+import threading
+import time
+
+from trakt_sync.ratelimit import TokenBucket
+
+
+def acquire_all(bucket, count):
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_raised_limit_releases_queued_callers():
+    bucket = TokenBucket(1, 1.0)
+    start = time.monotonic()
+    threads = acquire_all(bucket, 8)
+    time.sleep(0.1)
+    # The first response advertises the real limit.
+    bucket.set_limit(1000, 1.0)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert time.monotonic() - start < 1.0
+
+
+def test_set_limit_raises_the_burst():
+    bucket = TokenBucket(1, 1.0)
+    bucket.set_limit(100, 1.0)
+    assert bucket.burst == 10
+    bucket.set_limit(2, 1.0)
+    assert bucket.burst == 2
+
+
+def test_pause_holds_back_queued_callers():
+    bucket = TokenBucket(10, 1.0, burst=1)
+    bucket.acquire()
+    waited = []
+    thread = threading.Thread(target=lambda: waited.append(bucket.acquire()))
+    thread.start()
+    time.sleep(0.02)
+    # A 429 arrives while the second caller waits for its token.
+    bucket.pause(0.3)
+    thread.join(timeout=5)
+    assert waited[0] >= 0.25
@@ -0,0 +1,30 @@
+from trakt_sync.models import Movie
+from trakt_sync.resolve import best_match
+
+
+def result(title, year, trakt):
+    return {"type": "movie", "movie": {"title": title, "year": year, "ids": {"trakt": trakt}}}
+
+
+def test_exact_title_and_year_wins():
+    movie = Movie("Alien", 1979, "uri")
+    results = [result("Aliens", 1986, 2), result("Alien: Romulus", 2024, 3), result("ALIEN", 1979, 1)]
+    assert best_match(movie, results)["ids"]["trakt"] == 1
+
+
+def test_only_result_of_the_same_year_is_accepted():
+    movie = Movie("Amelie", 2001, "uri")
+    assert best_match(movie, [result("Amélie", 2001, 7)])["ids"]["trakt"] == 7
+    assert best_match(movie, [result("Amélie", 2002, 7)]) is None
+
+
+def test_unrelated_results_are_not_matched():
+    movie = Movie("Obscure Short", 2019, "uri")
+    results = [result("Obscure", 2019, 1), result("Short Cuts", 2019, 2)]
+    assert best_match(movie, results) is None
+
+
+def test_films_sharing_title_and_year_are_ambiguous():
+    movie = Movie("Crash", 2004, "uri")
+    assert best_match(movie, [result("Crash", 2004, 1), result("Crash", 2004, 2)]) is None
+    assert best_match(movie, [result("Crash", 2004, 1), result("Crash", 2004, 1)])["ids"]["trakt"] == 1
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from trakt_sync.scheduler import Scheduler, SchedulerClosed
+
+
+def test_higher_priority_endpoints_go_first_in_submission_order():
+    order = []
+    gate = threading.Event()
+    with Scheduler(workers=1) as scheduler:
+        # Keeps the only worker busy until everything is queued.
+        scheduler.submit("/sync/history", "blocker", 0, gate.wait)
+        for endpoint, label in [("/sync/history", "history 1"), ("/users/me/lists/7/items", "likes 1"),
+                                ("/sync/ratings", "ratings 1"), ("/sync/watchlist", "watchlist 1"),
+                                ("/sync/history", "history 2"), ("/sync/ratings", "ratings 2"),
+                                ("/unknown", "other 1")]:
+            scheduler.submit(endpoint, label, 1, order.append, label)
+        gate.set()
+    assert order == ["ratings 1", "ratings 2", "watchlist 1", "likes 1", "history 1", "history 2", "other 1"]
+    assert scheduler.summary()["chunks"] == 8
+
+
+def test_errors_reach_the_caller():
+    def fail():
+        raise RuntimeError("boom")
+
+    with Scheduler(workers=1) as scheduler:
+        failing = scheduler.submit("/sync/ratings", "failing", 1, fail)
+        with pytest.raises(RuntimeError):
+            failing.result()
+
+
+def test_failing_run_cancels_queued_chunks():
+    ran = []
+    with pytest.raises(RuntimeError):
+        with Scheduler(workers=1) as scheduler:
+            # Busy for a moment, so the next chunk is still queued when the run fails.
+            scheduler.submit("/sync/ratings", "busy", 1, threading.Event().wait, 0.3)
+            queued = scheduler.submit("/sync/history", "queued", 1, ran.append, "queued")
+            raise RuntimeError("run failed")
+    assert queued.cancelled()
+    assert ran == []
+
+
+def test_stopped_scheduler_refuses_new_chunks():
+    with Scheduler(workers=1) as scheduler:
+        scheduler.stop()
+        with pytest.raises(SchedulerClosed):
+            scheduler.submit("/sync/history", "late", 1, print)
+    with pytest.raises(SchedulerClosed):
+        scheduler.submit("/sync/history", "after close", 1, print)
@@ -0,0 +1,57 @@
+import os
+import zipfile
+
+import pytest
+
+from benchmarks.bench_sync import write_export
+from trakt_sync.parser import parse_csv
+from trakt_sync.source import ExportSource, is_export
+
+FILES = ("watchlist.csv", "ratings.csv", "watched.csv", "likes/films.csv")
+
+
+def zip_export(directory, path, root=""):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name in FILES:
+            archive.write(os.path.join(directory, *name.split("/")), root + name)
+
+
+@pytest.fixture
+def export(tmp_path):
+    directory = str(tmp_path / "export")
+    write_export(directory, 20, unmatched=0)
+    return directory
+
+
+@pytest.mark.parametrize("root", ["", "letterboxd-user-2024/"])
+def test_zip_reads_like_the_directory(export, tmp_path, root):
+    path = str(tmp_path / "export.zip")
+    zip_export(export, path, root)
+    assert is_export(path) and is_export(export)
+
+    with ExportSource(export) as folder, ExportSource(path) as archive:
+        assert archive.is_zip and not folder.is_zip
+        for name in FILES:
+            assert archive.exists(name)
+            with folder.open(name) as a, archive.open(name) as b:
+                assert list(parse_csv(a, "ratings")) == list(parse_csv(b, "ratings"))
+        assert not archive.exists("diary.csv")
+        assert archive.describe("watched.csv") == f"{path}!watched.csv"
+
+
+def test_zip_fingerprint_follows_content(export, tmp_path):
+    first, second = str(tmp_path / "first.zip"), str(tmp_path / "second.zip")
+    zip_export(export, first)
+    with open(os.path.join(export, "watched.csv"), "a", encoding="utf-8") as f:
+        f.write("2024-01-01,New Film,2024,https://boxd.it/new\n")
+    zip_export(export, second)
+
+    with ExportSource(first) as a, ExportSource(second) as b:
+        assert a.fingerprint("watchlist.csv") == b.fingerprint("watchlist.csv")
+        assert a.fingerprint("watched.csv") != b.fingerprint("watched.csv")
+
+
+def test_not_an_export(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("hello", encoding="utf-8")
+    assert not is_export(str(path))
@@ -0,0 +1,61 @@
+from trakt_sync.parser import parse_csv
+from trakt_sync.watermark import Watermark, WatermarkStore
+
+HEADER = "Date,Name,Year,Letterboxd URI\n"
+
+
+def row(i):
+    return f"2024-01-{i + 1:02d},Film {i},{2000 + i},https://boxd.it/{i}\n"
+
+
+def titles(path, watermark):
+    return [movie.title for movie in parse_csv(str(path), "watchlist", watermark)]
+
+
+def test_only_the_new_tail_is_read(tmp_path):
+    path = tmp_path / "watchlist.csv"
+    path.write_text(HEADER + row(0) + row(1), encoding="utf-8")
+    watermark = Watermark()
+    assert titles(path, watermark) == ["Film 0", "Film 1"]
+    assert not watermark.tail_only
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(row(2))
+    assert titles(path, watermark) == ["Film 2"]
+    assert watermark.tail_only
+    assert watermark.size == path.stat().st_size
+
+    assert titles(path, watermark) == []
+
+
+def test_changed_start_falls_back_to_the_whole_file(tmp_path):
+    path = tmp_path / "watchlist.csv"
+    path.write_text(HEADER + row(0) + row(1), encoding="utf-8")
+    watermark = Watermark()
+    titles(path, watermark)
+
+    path.write_text(HEADER + row(0).replace("Film 0", "Film Zero") + row(1) + row(2), encoding="utf-8")
+    assert titles(path, watermark) == ["Film Zero", "Film 1", "Film 2"]
+    assert not watermark.tail_only
+
+
+def test_watermark_not_moved_by_an_unfinished_read(tmp_path):
+    path = tmp_path / "watchlist.csv"
+    path.write_text(HEADER + row(0) + row(1), encoding="utf-8")
+    watermark = Watermark()
+    rows = parse_csv(str(path), "watchlist", watermark)
+    next(rows)
+    rows.close()
+    assert watermark.size == 0
+
+
+def test_store_keeps_marks_per_account_and_file(tmp_path):
+    path = str(tmp_path / "watermarks.json")
+    store = WatermarkStore(path)
+    mark = Watermark()
+    mark.advance(120, "abc", ["Date", "Name"])
+    store.put("alice", "watched.csv", mark)
+
+    reloaded = WatermarkStore(path)
+    assert reloaded.get("alice", "watched.csv") == mark
+    assert reloaded.get("bob", "watched.csv") == Watermark()
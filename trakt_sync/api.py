@@ -1,84 +1,403 @@
+import contextlib
+import hashlib
+import json
+import random
 import requests
+import threading
 import time
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+from .batching import AdaptiveBatcher, Batching
+from .deadletter import DeadLetterQueue
+from .httpcache import ResponseCache
+from .journal import Journal
+from .metrics import Metrics
 from .models import Movie
+from .payloads import build_payloads
+from .ratelimit import RateLimiter
+from .scheduler import Scheduler
+from .transport import Transport
+
+# Rejections caused by the content of a chunk: it is bisected to find the
+# offending items. Any other rejection sends the whole chunk to the
+# dead-letter queue as it is.
+BISECT_STATUSES = (400, 413, 422)
+
+# Attempts after a timeout, dropped connection or 5xx before giving up.
+TRANSIENT_RETRIES = 4
+
+
+class TraktUnavailable(Exception):
+    """Trakt kept timing out or failing with 5xx; the run should stop."""
+
+
+class ListUnavailable(Exception):
+    """The Trakt list for the likes could neither be found nor created."""
+
+
+def is_transient(status: Optional[int]) -> bool:
+    """A failure worth retrying as is: no response at all (None), 408 or 5xx."""
+    return status is None or status == 408 or status >= 500
+
+
+def transient_delay(attempt: int, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter for the `attempt`-th retry (from 0)."""
+    return min(cap, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+
+# Item type -> payload key in removal requests, most specific type first.
+REMOVE_KEYS = {"movie": "movies", "episode": "episodes", "season": "seasons", "show": "shows"}
 
 class TraktAPI:
-    def __init__(self, access_token: str, client_id: str):
-        self.base_url = "https://api.trakt.tv"
+    def __init__(self, access_token: str, client_id: str, transport: Optional[Transport] = None,
+                 rate_limiter: Optional[RateLimiter] = None, concurrency: int = 1,
+                 base_url: str = "https://api.trakt.tv", chunk_size: Optional[int] = None,
+                 dead_letters: Optional[DeadLetterQueue] = None, metrics: Optional[Metrics] = None,
+                 http_cache: Optional[ResponseCache] = None):
+        self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
             "trakt-api-version": "2",
             "trakt-api-key": client_id,
         }
-        
-    def _post(self, endpoint: str, payload: Dict[str, Any], retries: int = 5):
+        self.transport = transport or Transport()
+        self.transport.session.headers.update(self.headers)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.metrics = metrics or Metrics()
+        self.metrics.rate_limiter = self.rate_limiter
+        self.transport.metrics = self.metrics
+        self.concurrency = max(1, concurrency)
+        self.batching = Batching(pinned=chunk_size)
+        self.dead_letters = dead_letters
+        self.http_cache = http_cache
+        # Cached responses are per account; the token stands in for it.
+        self.cache_scope = hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+        # Set for the duration of a multi-phase run; see Scheduler.
+        self.scheduler: Optional[Scheduler] = None
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def _request(self, method: str, endpoint: str, retries: int = 8, **kwargs):
+        """
+        Sends a request through the shared transport, pacing it with the rate
+        limiter and retrying on 429 with the delay the server asks for.
+        Returns the final response, or None if still throttled after `retries`.
+        """
+        if method != "GET" and self.http_cache is not None:
+            try:
+                return self._send(method, endpoint, retries, **kwargs)
+            finally:
+                # Even a failed or timed out write may have changed something.
+                self.http_cache.invalidate(self.cache_scope, endpoint)
+        return self._send(method, endpoint, retries, **kwargs)
+
+    def _send(self, method: str, endpoint: str, retries: int = 8, **kwargs):
         url = f"{self.base_url}{endpoint}"
-        attempt = 0
-        while attempt < retries:
-            response = requests.post(url, headers=self.headers, json=payload)
-            if response.status_code in (200, 201):
-                return response.json()
-            elif response.status_code == 429:
-                print("Rate limited, waiting 5 seconds...")
-                time.sleep(5)
-                attempt += 1
-            else:
-                print(f"Error {response.status_code}: {response.text}")
-                return None
-                
+        for attempt in range(retries):
+            self.rate_limiter.acquire(method)
+            response = self.transport.request(method, url, **kwargs)
+            self.rate_limiter.observe(method, response)
+            if response.status_code != 429:
+                return response
+            delay = self.rate_limiter.backoff(method, response, attempt)
+            self.metrics.observe_retry(method, endpoint, delay)
+            with self._lock:
+                self.retries += 1
+            print(f"Rate limited on {endpoint}, retrying in {delay:.1f} seconds...")
+        print(f"Error: still rate limited on {endpoint} after {retries} attempts, giving up.")
+        return None
+
+    def _post_status(self, endpoint: str, payload: Union[Dict[str, Any], bytes], retries: int = 8,
+                     batcher: Optional[AdaptiveBatcher] = None) -> Tuple[Optional[int], Any]:
+        """
+        POSTs `payload` and returns (status, body): the decoded JSON on
+        success, otherwise the error text. The status is None when the
+        request timed out or the connection failed, and 429 when it was still
+        throttled after `retries` attempts.
+        """
+        if isinstance(payload, bytes):
+            # Already serialized (see plan.py): sent exactly as is.
+            items, body = 0, {"data": payload}
+        else:
+            items, body = sum(len(v) for v in payload.values() if isinstance(v, list)), {"json": payload}
+        try:
+            response = self._request("POST", endpoint, retries=retries, **body)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if batcher:
+                batcher.record(items, 0.0, None)
+            return None, str(e)
+        if response is None:
+            return 429, "rate limited"
+        if batcher:
+            batcher.record(items, response.elapsed.total_seconds(), response.status_code)
+        if response.status_code in (200, 201):
+            return response.status_code, response.json()
+        return response.status_code, response.text
+
+    def _post_retrying(self, endpoint: str, payload: Union[Dict[str, Any], bytes], retries: int = 8,
+                       batcher: Optional[AdaptiveBatcher] = None) -> Tuple[Optional[int], Any]:
+        """_post_status, retrying timeouts, dropped connections and 5xx with backoff."""
+        for attempt in range(TRANSIENT_RETRIES + 1):
+            status, body = self._post_status(endpoint, payload, retries, batcher)
+            if not is_transient(status) or attempt == TRANSIENT_RETRIES:
+                return status, body
+            delay = transient_delay(attempt)
+            self.metrics.observe_retry("POST", endpoint, delay)
+            with self._lock:
+                self.retries += 1
+            failure = "Request failed" if status is None else f"Error {status}"
+            print(f"{failure} on {endpoint}, retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+
+    def _post(self, endpoint: str, payload: Dict[str, Any], retries: int = 8,
+              batcher: Optional[AdaptiveBatcher] = None):
+        status, body = self._post_retrying(endpoint, payload, retries, batcher)
+        if status in (200, 201):
+            return body
+        if status is None:
+            print(f"Error: request to {endpoint} failed: {body}")
+        elif status != 429:
+            print(f"Error {status}: {body}")
+        return None
+
+    def _request_retrying(self, method: str, endpoint: str, headers: Optional[Dict[str, str]] = None):
+        """
+        Sends a GET or DELETE, retrying timeouts, dropped connections and 5xx
+        with backoff. Raises TraktUnavailable once the retries run out, as an
+        empty or missing answer would be taken for an empty collection.
+        """
+        kwargs = {"headers": headers} if headers else {}
+        for attempt in range(TRANSIENT_RETRIES + 1):
+            try:
+                response = self._request(method, endpoint, **kwargs)
+                status = response.status_code if response is not None else 429
+                failure = f"Error {status}"
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                response, status, failure = None, None, str(e)
+            if not is_transient(status):
+                return response
+            if attempt == TRANSIENT_RETRIES:
+                raise TraktUnavailable(f"{method} {endpoint} kept failing ({failure[:200]})")
+            delay = transient_delay(attempt)
+            self.metrics.observe_retry(method, endpoint, delay)
+            with self._lock:
+                self.retries += 1
+            print(f"{'Request failed' if status is None else failure} on {endpoint}, "
+                  f"retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+
+    def _fetch(self, endpoint: str):
+        """GETs `endpoint`, through the response cache when there is one."""
+        if self.http_cache is None:
+            return self._request_retrying("GET", endpoint)
+        return self.http_cache.fetch(self.cache_scope, endpoint,
+                                     lambda headers: self._request_retrying("GET", endpoint, headers))
+
     def _get(self, endpoint: str):
-        url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200:
+        response = self._fetch(endpoint)
+        if response is not None and response.status_code == 200:
             return response.json()
         return None
 
-    def sync_watchlist(self, movies: List[Movie]):
-        chunk_size = 100
-        for i in range(0, len(movies), chunk_size):
-            chunk = movies[i:i + chunk_size]
-            payload = {
-                "movies": [{"title": m.title, "year": m.year} for m in chunk]
-            }
-            print(f"Syncing watchlist chunk {i//chunk_size + 1}...")
-            self._post("/sync/watchlist", payload)
-
-    def sync_ratings(self, movies: List[Movie]):
-        chunk_size = 100
-        for i in range(0, len(movies), chunk_size):
-            chunk = movies[i:i + chunk_size]
-            payload = {
-                "movies": [{
-                    "title": m.title, 
-                    "year": m.year, 
-                    "rating": int(m.rating * 2) if m.rating else None, # Trakt uses 1-10
-                    "rated_at": m.watched_at # Use watched date as rated date if available approximation
-                } for m in chunk if m.rating]
-            }
-            if not payload["movies"]: continue
-            print(f"Syncing ratings chunk {i//chunk_size + 1}...")
-            self._post("/sync/ratings", payload)
-
-    def sync_history(self, movies: List[Movie]):
-        chunk_size = 100
-        for i in range(0, len(movies), chunk_size):
-            chunk = movies[i:i + chunk_size]
-            # Group by movie to avoid duplicates in payload? 
-            # Ideally each history entry is unique. 
-            # Trakt history sync is add-only.
-            payload = {
-                "movies": [{
-                    "title": m.title, 
-                    "year": m.year, 
-                    "watched_at": f"{m.watched_at}T12:00:00.000Z" if m.watched_at else None
-                } for m in chunk if m.watched_at]
-            }
-            if not payload["movies"]: continue
-            print(f"Syncing history chunk {i//chunk_size + 1}...")
-            self._post("/sync/history", payload)
+    def _chunks(self, items: Iterable, endpoint: str) -> Iterator[List]:
+        # The size is re-read for every chunk so it follows the batcher as
+        # responses come back.
+        batcher = self.batching.for_endpoint(endpoint)
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= batcher.size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _flatten(payload: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        return [(key, item) for key, items in payload.items() if isinstance(items, list) for item in items]
+
+    @staticmethod
+    def _regroup(pairs: List[Tuple[str, Any]]) -> Dict[str, List]:
+        payload = {}
+        for key, item in pairs:
+            payload.setdefault(key, []).append(item)
+        return payload
+
+    @staticmethod
+    def _merge_responses(a: Optional[Dict], b: Optional[Dict]) -> Optional[Dict]:
+        if not a or not b:
+            return a or b
+        merged = {}
+        for section in set(a) | set(b):
+            x, y = a.get(section), b.get(section)
+            if not isinstance(x, dict) or not isinstance(y, dict):
+                merged[section] = x if x is not None else y
+                continue
+            merged[section] = {}
+            for key in set(x) | set(y):
+                vx, vy = x.get(key), y.get(key)
+                if isinstance(vx, list) or isinstance(vy, list):
+                    merged[section][key] = (vx or []) + (vy or [])
+                else:
+                    merged[section][key] = (vx or 0) + (vy or 0)
+        return merged
+
+    def _post_chunk(self, endpoint: str, payload: Dict[str, Any], journal: Optional[Journal] = None,
+                    fingerprints: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        POSTs one chunk. If Trakt rejects its content, the chunk is split in
+        half and each half retried, recursively, so the good items still get
+        through and only the items that fail on their own reach the
+        dead-letter queue. Timeouts and 5xx are retried as they are and raise
+        TraktUnavailable once the retries run out.
+        """
+        status, body = self._post_retrying(endpoint, payload, batcher=self.batching.for_endpoint(endpoint))
+        if status in (200, 201):
+            # Recorded from the worker itself so a chunk acknowledged while
+            # the run is being interrupted still makes it into the journal.
+            if journal is not None:
+                journal.record(endpoint, fingerprints)
+            return body
+        return self._isolate_failure(endpoint, payload, status, body, journal, fingerprints)
+
+    def _post_raw(self, endpoint: str, body: bytes, journal: Optional[Journal] = None,
+                  fingerprints: Optional[List[str]] = None) -> Optional[Dict]:
+        """POSTs a pre-serialized body; it is only decoded if Trakt rejects it."""
+        status, response = self._post_retrying(endpoint, body)
+        if status in (200, 201):
+            return response
+        return self._isolate_failure(endpoint, json.loads(body), status, response, journal, fingerprints)
+
+    def _isolate_failure(self, endpoint: str, payload: Dict[str, Any], status: Optional[int], body: Any,
+                         journal: Optional[Journal], fingerprints: Optional[List[str]]) -> Optional[Dict]:
+        pairs = self._flatten(payload)
+        if status not in BISECT_STATUSES or len(pairs) <= 1:
+            error = "rate limited" if status == 429 else str(body)
+            print(f"Error {status} on {endpoint} for {len(pairs)} item(s): {error[:200]}")
+            # With a journal, --resume sends what an outage left unacknowledged,
+            # together with the chunks never submitted; queuing it for
+            # --retry-failed as well would send it twice.
+            outage = is_transient(status)
+            if self.dead_letters is not None and not (outage and journal is not None):
+                for key, item in pairs:
+                    self.dead_letters.add(endpoint, key, item, status, error)
+            if outage:
+                # Not bisected: splitting doesn't help an outage, and a timed
+                # out POST may have been applied already.
+                raise TraktUnavailable(f"{endpoint} kept failing ({error[:200]})")
+            return None
+
+        print(f"Error {status} on {endpoint}, splitting chunk of {len(pairs)} items...")
+        middle = len(pairs) // 2
+        halves = []
+        for part in (slice(0, middle), slice(middle, None)):
+            part_fingerprints = fingerprints[part] if fingerprints is not None else None
+            halves.append(self._post_chunk(endpoint, self._regroup(pairs[part]), journal, part_fingerprints))
+        return self._merge_responses(*halves)
+
+    def _send_chunks(self, endpoint: str, payloads: Iterable[Union[Dict[str, Any], bytes]], label: str,
+                     journal: Optional[Journal] = None) -> List[Optional[Dict]]:
+        """
+        POSTs each payload to `endpoint`, keeping up to `self.concurrency`
+        requests in flight. Empty payloads are skipped but keep their chunk
+        number; with a journal, items it already holds are dropped first and
+        acknowledged chunks are recorded. Pre-serialized bytes payloads are
+        sent as they are. Returns the responses in chunk order.
+        """
+        def prepare(number, payload):
+            if isinstance(payload, bytes):
+                if self.scheduler is None:
+                    print(f"{label} chunk {number}...")
+                return payload, None
+            fingerprints = None
+            if journal is not None:
+                had_items = any(payload.values())
+                payload, fingerprints = journal.pending(payload)
+                if had_items and not any(payload.values()):
+                    print(f"{label} chunk {number}: already synced, skipping.")
+                    return None
+            if not any(payload.values()):
+                return None
+            if self.scheduler is None:
+                print(f"{label} chunk {number}...")
+            return payload, fingerprints
+
+        def post(payload):
+            return self._post_raw if isinstance(payload, bytes) else self._post_chunk
+
+        results = []
+        if self.scheduler is None and self.concurrency <= 1:
+            for number, payload in enumerate(payloads, 1):
+                prepared = prepare(number, payload)
+                results.append(post(prepared[0])(endpoint, prepared[0], journal, prepared[1]) if prepared else None)
+            return results
+
+        # Submission is windowed so a large (or streamed) input never has
+        # more than a couple of rounds of chunks queued up in memory.
+        window = max(2, self.concurrency * 2)
+        pending = deque()
+        with contextlib.ExitStack() as stack:
+            if self.scheduler is not None:
+                # Chunks join the run-wide queue and interleave with other phases.
+                def submit(number, payload, fingerprints):
+                    items = 0 if isinstance(payload, bytes) else sum(
+                        len(v) for v in payload.values() if isinstance(v, list))
+                    return self.scheduler.submit(endpoint, f"{label} chunk {number}", items,
+                                                 post(payload), endpoint, payload, journal, fingerprints)
+            else:
+                executor = stack.enter_context(ThreadPoolExecutor(max_workers=self.concurrency))
+
+                def submit(number, payload, fingerprints):
+                    return executor.submit(post(payload), endpoint, payload, journal, fingerprints)
+
+            for number, payload in enumerate(payloads, 1):
+                prepared = prepare(number, payload)
+                if prepared is None:
+                    pending.append(None)
+                    continue
+                pending.append(submit(number, *prepared))
+                while len(pending) >= window:
+                    future = pending.popleft()
+                    results.append(future.result() if future else None)
+            while pending:
+                future = pending.popleft()
+                results.append(future.result() if future else None)
+        return results
+
+    def sync_watchlist(self, movies: Iterable[Movie], journal: Optional[Journal] = None):
+        endpoint = "/sync/watchlist"
+        payloads = build_payloads('watchlist', self._chunks(movies, endpoint))
+        return self._send_chunks(endpoint, payloads, "Syncing watchlist", journal)
+
+    def sync_ratings(self, movies: Iterable[Movie], journal: Optional[Journal] = None):
+        endpoint = "/sync/ratings"
+        payloads = build_payloads('ratings', self._chunks(movies, endpoint))
+        return self._send_chunks(endpoint, payloads, "Syncing ratings", journal)
+
+    def sync_history(self, movies: Iterable[Movie], journal: Optional[Journal] = None):
+        endpoint = "/sync/history"
+        payloads = build_payloads('watched', self._chunks(movies, endpoint))
+        return self._send_chunks(endpoint, payloads, "Syncing history", journal)
             
+    def send_payloads(self, endpoint: str, payloads: Iterable[Union[Dict[str, Any], bytes]], label: str,
+                      journal: Optional[Journal] = None) -> List[Optional[Dict]]:
+        """
+        POSTs ready-made payloads to `endpoint`, e.g. the bodies of a plan,
+        with the same concurrency, retries and failure isolation as the sync
+        methods. Bytes payloads are sent as they are. Returns the responses in
+        chunk order.
+        """
+        return self._send_chunks(endpoint, payloads, label, journal)
+
+    def get_username(self) -> Optional[str]:
+        settings = self._get("/users/settings")
+        if not settings:
+            return None
+        user = settings.get("user", {})
+        return user.get("ids", {}).get("slug") or user.get("username")
+
     def get_user_lists(self):
         return self._get(f"/users/me/lists")
 
@@ -92,8 +411,8 @@ class TraktAPI:
         }
         return self._post(f"/users/me/lists", payload)
 
-    def sync_likes_to_list(self, movies: List[Movie], list_name: str = "Favorites"):
-        lists = self.get_user_lists()
+    def find_or_create_list(self, list_name: str) -> Optional[Dict]:
+        lists = self.get_user_lists() or []
         target_list = next((l for l in lists if l['name'] == list_name), None)
         
         if not target_list:
@@ -101,20 +420,28 @@ class TraktAPI:
             target_list = self.create_list(list_name)
             if not target_list:
                 print("Failed to create list.")
-                return
+        return target_list
+
+    def sync_likes_to_list(self, movies: Iterable[Movie], list_name: str = "Favorites",
+                           journal: Optional[Journal] = None):
+        target_list = self.find_or_create_list(list_name)
+        if not target_list:
+            raise ListUnavailable(f"Trakt list '{list_name}' could not be found or created")
         
         list_id = target_list['ids']['trakt']
         
-        chunk_size = 100
-        for i in range(0, len(movies), chunk_size):
-            chunk = movies[i:i + chunk_size]
-            payload = {
-                "movies": [{"title": m.title, "year": m.year} for m in chunk]
-            }
-            print(f"Syncing {list_name} chunk {i//chunk_size + 1}...")
-            self._post(f"/users/me/lists/{list_id}/items", payload)
+        endpoint = f"/users/me/lists/{list_id}/items"
+        payloads = build_payloads('likes', self._chunks(movies, endpoint))
+        return self._send_chunks(endpoint, payloads, f"Syncing {list_name}", journal)
 
     # Retrieval Methods
+    def search_movie(self, title: str, year: Optional[int] = None) -> Optional[List[Dict]]:
+        """Text search on movie titles; None if the request failed."""
+        query = {"query": title, "fields": "title"}
+        if year:
+            query["years"] = year
+        return self._get(f"/search/movie?{urlencode(query)}")
+
     def get_watchlist(self):
         return self._get(f"/sync/watchlist")
 
@@ -122,67 +449,127 @@ class TraktAPI:
         return self._get(f"/sync/ratings")
         
     def get_history(self):
-        # History can be huge, pagination might be needed. 
-        # For now, let's grab a large limit.
-        return self._get(f"/sync/history?limit=10000") 
+        return list(self.iter_history())
+
+    def _get_page(self, endpoint: str, page: int, limit: int):
+        """Returns (items, page_count, item_count) for one page of `endpoint`."""
+        separator = "&" if "?" in endpoint else "?"
+        response = self._fetch(f"{endpoint}{separator}page={page}&limit={limit}")
+        if response is None or response.status_code != 200:
+            return [], 0, 0
+        page_count = int(response.headers.get("X-Pagination-Page-Count", 1))
+        item_count = int(response.headers.get("X-Pagination-Item-Count", 0))
+        return response.json(), page_count, item_count
+
+    def count_items(self, endpoint: str) -> int:
+        """Total number of items behind a paginated endpoint, from one tiny page."""
+        items, _, item_count = self._get_page(endpoint, 1, 1)
+        return item_count or len(items)
+
+    def iter_pages(self, endpoint: str, limit: int = 1000, prefetch: int = 2,
+                   reverse: bool = False) -> Iterator[List[Dict]]:
+        """
+        Yields the pages of a paginated endpoint, following Trakt's
+        X-Pagination headers, while up to `prefetch` upcoming pages are
+        fetched in the background. Only those pages are held in memory.
+
+        With reverse=True pages are yielded last to first, which is what a
+        caller deleting items as they arrive needs: removing items from a
+        later page never shifts the contents of an earlier one.
+        """
+        first, page_count, _ = self._get_page(endpoint, 1, limit)
+        if page_count <= 1:
+            if first:
+                yield first
+            return
+        if not reverse:
+            yield first
+        order = range(page_count, 1, -1) if reverse else range(2, page_count + 1)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        try:
+            upcoming = deque()
+            pages = iter(order)
+            for page in pages:
+                upcoming.append(executor.submit(self._get_page, endpoint, page, limit))
+                if len(upcoming) > prefetch:
+                    break
+            while upcoming:
+                items = upcoming.popleft().result()[0]
+                next_page = next(pages, None)
+                if next_page is not None:
+                    upcoming.append(executor.submit(self._get_page, endpoint, next_page, limit))
+                if items:
+                    yield items
+        finally:
+            executor.shutdown(wait=True)
+        if reverse and first:
+            yield first
+
+    def iter_history(self, limit: int = 1000, reverse: bool = False) -> Iterator[Dict]:
+        for page in self.iter_pages("/sync/history", limit=limit, reverse=reverse):
+            yield from page
 
     # Removal Methods
-    def _prepare_remove_payload(self, items: List[Dict]) -> Dict[str, List[Dict]]:
-        payload = {"movies": [], "shows": [], "episodes": []}
+    def _prepare_remove_payload(self, items: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Builds a removal payload in one pass. Each entry carries only the
+        Trakt ID when there is one, which is all Trakt needs to find it.
+        """
+        payload = {}
         for item in items:
             media_type = item.get("type")
-            if media_type == "movie" and "movie" in item:
-                payload["movies"].append({"ids": item["movie"]["ids"]})
-            elif media_type == "show" and "show" in item:
-                payload["shows"].append({"ids": item["show"]["ids"]})
-            elif media_type == "episode" and "episode" in item:
-                payload["episodes"].append({"ids": item["episode"]["ids"]})
-            elif media_type == "season" and "season" in item:
-                 # Trakt API also supports seasons
-                 if "seasons" not in payload: payload["seasons"] = []
-                 payload["seasons"].append({"ids": item["season"]["ids"]})
-            # Handle cases where type might be missing but keys exist
-            elif "movie" in item:
-                payload["movies"].append({"ids": item["movie"]["ids"]})
-            elif "show" in item:
-                payload["shows"].append({"ids": item["show"]["ids"]})
-            elif "episode" in item:
-                payload["episodes"].append({"ids": item["episode"]["ids"]})
+            if media_type not in REMOVE_KEYS or media_type not in item:
+                # Type missing: take the most specific object present, so an
+                # episode entry (which also embeds its show) removes the episode.
+                media_type = next((t for t in REMOVE_KEYS if t in item), None)
+                if media_type is None:
+                    continue
+            ids = item[media_type]["ids"]
+            ref = {"ids": {"trakt": ids["trakt"]}} if ids.get("trakt") else {"ids": ids}
+            payload.setdefault(REMOVE_KEYS[media_type], []).append(ref)
         return payload
 
-    def remove_from_watchlist(self, items: List[Dict]):
-        chunk_size = 100
-        for i in range(0, len(items), chunk_size):
-            chunk = items[i:i + chunk_size]
-            payload = self._prepare_remove_payload(chunk)
-            if not any(payload.values()): continue
-            
-            print(f"Removing watchlist chunk {i//chunk_size + 1}...")
-            self._post("/sync/watchlist/remove", payload)
-
-    def remove_ratings(self, items: List[Dict]):
-        chunk_size = 100
-        for i in range(0, len(items), chunk_size):
-            chunk = items[i:i + chunk_size]
-            payload = self._prepare_remove_payload(chunk)
-            if not any(payload.values()): continue
-            
-            print(f"Removing ratings chunk {i//chunk_size + 1}...")
-            self._post("/sync/ratings/remove", payload)
+    def remove_from_watchlist(self, items: Iterable[Dict]):
+        endpoint = "/sync/watchlist/remove"
+        payloads = (self._prepare_remove_payload(chunk) for chunk in self._chunks(items, endpoint))
+        return self._send_chunks(endpoint, payloads, "Removing watchlist")
+
+    def remove_ratings(self, items: Iterable[Dict]):
+        endpoint = "/sync/ratings/remove"
+        payloads = (self._prepare_remove_payload(chunk) for chunk in self._chunks(items, endpoint))
+        return self._send_chunks(endpoint, payloads, "Removing ratings")
 
-    def remove_history(self, items: List[Dict]):
-        chunk_size = 100
-        for i in range(0, len(items), chunk_size):
-            chunk = items[i:i + chunk_size]
-            payload = self._prepare_remove_payload(chunk)
-            if not any(payload.values()): continue
+    def remove_history(self, items: Iterable[Dict]):
+        # History entries carry their own play id; removing by it deletes
+        # exactly that play rather than every play of the same movie.
+        endpoint = "/sync/history/remove"
+        payloads = (
+            {"ids": [item["id"] for item in chunk if "id" in item],
+             **self._prepare_remove_payload([item for item in chunk if "id" not in item])}
+            for chunk in self._chunks(items, endpoint)
+        )
+        return self._send_chunks(endpoint, payloads, "Removing history")
 
-            print(f"Removing history chunk {i//chunk_size + 1}...")
-            self._post("/sync/history/remove", payload)
+    def retry_failed(self) -> int:
+        """Replays the dead-letter queue; items failing again are queued anew."""
+        entries = self.dead_letters.take()
+        by_endpoint: Dict[str, List[Tuple[str, Any]]] = {}
+        for entry in entries:
+            by_endpoint.setdefault(entry["endpoint"], []).append((entry["key"], entry["item"]))
+        for endpoint, pairs in by_endpoint.items():
+            payloads = (self._regroup(chunk) for chunk in self._chunks(pairs, endpoint))
+            self._send_chunks(endpoint, payloads, f"Retrying {endpoint}")
+        self.dead_letters.done_replaying()
+        return len(entries)
 
     def delete_list(self, list_id: str):
-        response = requests.delete(f"{self.base_url}/users/me/lists/{list_id}", headers=self.headers)
-        if response.status_code == 204:
+        response = self._request_retrying("DELETE", f"/users/me/lists/{list_id}")
+        if response is not None and response.status_code == 204:
             print(f"List {list_id} deleted.")
+        elif response is not None and response.status_code == 404:
+            # E.g. an earlier attempt went through but its answer was lost.
+            print(f"List {list_id} is already gone.")
         else:
-            print(f"Failed to delete list {list_id}: {response.status_code}")
+            status = response.status_code if response is not None else 429
+            print(f"Failed to delete list {list_id}: {status}")
@@ -16,7 +16,7 @@ def get_authorization_url(client_id: str) -> str:
     }
     return f"{base_url}?{'&'.join([f'{key}={val}' for key, val in params.items()])}"
 
-def get_access_token(client_id: str, client_secret: str, auth_code: str) -> str:
+def get_access_token(client_id: str, client_secret: str, auth_code: str, token_file: str = TOKEN_FILE) -> str:
     token_url = "https://api.trakt.tv/oauth/token"
     payload = {
         "code": auth_code,
@@ -29,16 +29,16 @@ def get_access_token(client_id: str, client_secret: str, auth_code: str) -> str:
     response = requests.post(token_url, json=payload)
     if response.status_code == 200:
         data = response.json()
-        with open(TOKEN_FILE, 'w') as f:
+        with open(token_file, 'w') as f:
             json.dump(data, f)
         return data["access_token"]
     else:
         raise Exception(f"Error obtaining access token: {response.text}")
 
-def authenticate(client_id: str, client_secret: str) -> str:
-    if os.path.exists(TOKEN_FILE):
+def authenticate(client_id: str, client_secret: str, token_file: str = TOKEN_FILE) -> str:
+    if os.path.exists(token_file):
         try:
-            with open(TOKEN_FILE, 'r') as f:
+            with open(token_file, 'r') as f:
                 data = json.load(f)
                 return data["access_token"]
         except (json.JSONDecodeError, KeyError):
@@ -49,4 +49,4 @@ def authenticate(client_id: str, client_secret: str) -> str:
     webbrowser.open(auth_url)
     
     code = input("Enter the code from Trakt: ")
-    return get_access_token(client_id, client_secret, code)
+    return get_access_token(client_id, client_secret, code, token_file)
@@ -0,0 +1,226 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from .metrics import RESULT_SECTIONS
+
+BATCH_LOG_DIR = "batch_logs"
+
+# Options a manifest can't set per account: they belong to the batch itself
+# or are filled in by it.
+BATCH_OPTIONS = ("batch", "workers", "batch_logs", "account_timeout", "daemon", "token_file", "data_dir",
+                 "metrics_json")
+
+# Makes `python -m trakt_sync.main` importable from any working directory.
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads a batch manifest:
+
+        {
+          "defaults": {"sync": "all", "incremental": true, "concurrency": 4},
+          "accounts": [
+            {"name": "alice", "token": "tokens/alice.json", "data_dir": "exports/alice.zip",
+             "options": {"list_name": "Liked on Letterboxd"}}
+          ]
+        }
+
+    Options are the command line flags without dashes (`list_name` for
+    --list-name); `true` passes a switch. Relative token and data_dir paths
+    are taken from the manifest's directory. Returns the accounts with their
+    defaults merged in.
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get("defaults", {})
+    accounts = []
+    for number, entry in enumerate(manifest.get("accounts", []), 1):
+        if not entry.get("token"):
+            raise ValueError(f"Account {number} in {path} has no token file")
+        account = {
+            "name": entry.get("name") or os.path.splitext(os.path.basename(entry["token"]))[0],
+            "token": os.path.join(base, entry["token"]),
+            "data_dir": os.path.join(base, entry["data_dir"]) if entry.get("data_dir") else None,
+            "options": {**defaults, **entry.get("options", {})},
+        }
+        clashes = [key for key in account["options"] if key.replace("-", "_") in BATCH_OPTIONS]
+        if clashes:
+            raise ValueError(f"Account '{account['name']}' sets {', '.join(clashes)}, which --batch controls")
+        accounts.append(account)
+    names = Counter(account["name"] for account in accounts)
+    duplicates = [name for name, count in names.items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Account names must be unique, repeated: {', '.join(duplicates)}")
+    return accounts
+
+
+def account_argv(account: Dict[str, Any], log_dir: str) -> List[str]:
+    """Command line for one account's run."""
+    name = account["name"]
+    options = {
+        # Per-account files, so parallel runs never write to the same one.
+        # The ID and HTTP caches are shared: they commit every write at once
+        # in WAL mode, so runs only ever wait briefly for each other.
+        "failed_file": os.path.join(log_dir, f"{name}.failed_items.jsonl"),
+        "watermarks": os.path.join(log_dir, f"{name}.watermarks.json"),
+        **account["options"],
+        "token_file": account["token"],
+        "data_dir": account["data_dir"],
+        "metrics_json": os.path.join(log_dir, f"{name}.metrics.json"),
+        "no_input": True,
+    }
+    argv = []
+    for key, value in options.items():
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif value is not None and value is not False:
+            argv += [flag, str(value)]
+    return argv
+
+
+def summarize(metrics: Dict[str, Any]) -> Dict[str, int]:
+    """Request, retry and result counts of one account's metrics."""
+    summary = Counter({section: 0 for section in RESULT_SECTIONS})
+    for counts in metrics.get("items", {}).values():
+        for key, count in counts.items():
+            summary[key.split(".", 1)[0]] += count
+    summary["requests"] = sum(metrics.get("requests", {}).values())
+    summary["retries"] = sum(metrics.get("retries", {}).values())
+    return dict(summary)
+
+
+def count_lines(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def run_account(account: Dict[str, Any], argv: List[str], log_dir: str,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Runs one account in its own process, so it gets its own HTTP session and
+    rate budget and a crash only takes that account down. A run still going
+    after `timeout` seconds is killed and reported with exit_code "timeout".
+    Output goes to `<log_dir>/<name>.log`.
+    """
+    name = account["name"]
+    log_path = os.path.join(log_dir, f"{name}.log")
+    metrics_path = os.path.join(log_dir, f"{name}.metrics.json")
+    if os.path.exists(metrics_path):
+        os.remove(metrics_path)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get("PYTHONPATH")]))
+    env["PYTHONUNBUFFERED"] = "1"
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        try:
+            process = subprocess.run([sys.executable, "-m", "trakt_sync.main", *argv], stdin=subprocess.DEVNULL,
+                                     stdout=log, stderr=subprocess.STDOUT, env=env, timeout=timeout)
+            exit_code = process.returncode
+        except subprocess.TimeoutExpired:
+            exit_code = "timeout"
+    result = {
+        "name": name,
+        "ok": exit_code == 0,
+        "exit_code": exit_code,
+        "seconds": time.perf_counter() - start,
+        "log": log_path,
+        "failed_items": count_lines(argv[argv.index("--failed-file") + 1]),
+    }
+    if os.path.exists(metrics_path):
+        with open(metrics_path, encoding="utf-8") as f:
+            result.update(summarize(json.load(f)))
+    return result
+
+
+def print_summary(results: List[Dict[str, Any]], seconds: float):
+    print(f"\n{'account':<24} {'status':<8} {'time':>8} {'requests':>9} {'added':>7} "
+          f"{'existing':>9} {'not found':>10} {'failed':>7}")
+    for r in results:
+        if r["ok"]:
+            status = "ok"
+        else:
+            status = "timeout" if r["exit_code"] == "timeout" else f"exit {r['exit_code']}"
+        print(f"{r['name'][:24]:<24} {status:<8} {r['seconds']:>7.1f}s {r.get('requests', 0):>9} "
+              f"{r.get('added', 0):>7} {r.get('existing', 0):>9} {r.get('not_found', 0):>10} "
+              f"{r['failed_items']:>7}")
+    failed = [r["name"] for r in results if not r["ok"]]
+    totals = Counter()
+    for r in results:
+        totals.update({key: r.get(key, 0) for key in ("requests", "retries", "added", "existing",
+                                                       "not_found", "failed_items")})
+    print(f"\n{len(results) - len(failed)} of {len(results)} accounts synced in {seconds:.1f}s: "
+          f"{totals['added']} items added, {totals['existing']} already there, "
+          f"{totals['not_found']} not found, {totals['failed_items']} failed, "
+          f"{totals['requests']} requests ({totals['retries']} retried).")
+    if failed:
+        print(f"Failed: {', '.join(failed)} (see their logs).")
+
+
+def run_batch(parser, args) -> bool:
+    """
+    --batch: syncs every account of the manifest, `args.workers` at a time,
+    then prints one summary. Returns False if any account failed.
+
+    Args:
+        parser: The command line parser, to check each account's options
+            before anything starts.
+        args: Parsed command line of the batch itself.
+    """
+    try:
+        accounts = load_manifest(args.batch)
+    except (OSError, ValueError) as e:
+        print(f"Error: can't read batch manifest: {e}")
+        return False
+    os.makedirs(args.batch_logs, exist_ok=True)
+
+    commands = {}
+    for account in accounts:
+        # Credentials given to the batch serve every account that sets none.
+        for key in ("client_id", "client_secret"):
+            if getattr(args, key):
+                account["options"].setdefault(key, getattr(args, key))
+        argv = account_argv(account, args.batch_logs)
+        try:
+            parser.parse_args(argv)
+        except SystemExit:
+            print(f"Error: invalid options for account '{account['name']}'.")
+            return False
+        commands[account["name"]] = argv
+
+    print(f"Syncing {len(accounts)} accounts, {args.workers} at a time (logs in {args.batch_logs})...")
+    start = time.perf_counter()
+    results: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(run_account, account, commands[account["name"]], args.batch_logs,
+                                   args.account_timeout): account
+                   for account in accounts}
+        for future in as_completed(futures):
+            name = futures[future]["name"]
+            try:
+                result = future.result()
+            except OSError as e:
+                result = {"name": name, "ok": False, "exit_code": None, "seconds": 0.0, "failed_items": 0,
+                          "error": str(e)}
+            results[name] = result
+            status = "done" if result["ok"] else "FAILED"
+            print(f"[{len(results)}/{len(accounts)}] {name} {status} in {result['seconds']:.1f}s.")
+    seconds = time.perf_counter() - start
+
+    ordered = [results[account["name"]] for account in accounts]
+    print_summary(ordered, seconds)
+    if args.metrics_json:
+        with open(args.metrics_json, "w", encoding="utf-8") as f:
+            json.dump({"seconds": seconds, "accounts": ordered}, f, indent=2, sort_keys=True)
+        print(f"Batch summary written to {args.metrics_json}.")
+    return all(result["ok"] for result in ordered)
@@ -0,0 +1,94 @@
+import re
+import threading
+from typing import Dict, Optional
+
+# Largest chunk sent to each endpoint. Trakt doesn't publish hard limits;
+# these stay well inside what the API accepts in practice.
+DEFAULT_CAPS = {
+    "/sync/watchlist": 500,
+    "/sync/ratings": 500,
+    "/sync/history": 1000,
+    "/sync/watchlist/remove": 1000,
+    "/sync/ratings/remove": 1000,
+    "/sync/history/remove": 1000,
+    "/users/me/lists/*/items": 500,
+}
+
+# Statuses that suggest the request was too big (or the server overloaded).
+SHRINK_STATUSES = (408, 413, 500, 502, 503, 504)
+
+
+def endpoint_key(endpoint: str) -> str:
+    """Groups endpoints that only differ by an ID, e.g. list item URLs."""
+    return re.sub(r"/\d+(?=/|$)", "/*", endpoint.split("?", 1)[0])
+
+
+class AdaptiveBatcher:
+    """
+    Chunk size controller for one endpoint.
+
+    Tracks the per-item cost of successful requests (an exponentially
+    weighted moving average of response time / items) and sizes chunks so a
+    request takes about `target_latency` seconds, growing at most 2x per
+    response. Timeouts, 5xx and 413 responses halve the size.
+
+    Args:
+        initial: Starting chunk size.
+        minimum: Smallest chunk size.
+        maximum: Largest chunk size for this endpoint.
+        target_latency: Desired response time per request, in seconds.
+        pinned: Fixed chunk size; disables adaptation.
+    """
+
+    def __init__(self, initial: int = 100, minimum: int = 10, maximum: int = 500,
+                 target_latency: float = 4.0, pinned: Optional[int] = None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.pinned = pinned
+        self.size = pinned or max(minimum, min(initial, maximum))
+        self.cost: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float, status: Optional[int]):
+        """Feeds back one response; status None means the request failed or timed out."""
+        if self.pinned or items <= 0:
+            return
+        with self._lock:
+            if status is None or status in SHRINK_STATUSES:
+                self.size = max(self.minimum, self.size // 2)
+                return
+            if status >= 400:
+                # Other client errors are about the content, not the size.
+                return
+            cost = max(seconds, 1e-6) / items
+            self.cost = cost if self.cost is None else 0.7 * self.cost + 0.3 * cost
+            target = int(self.target_latency / self.cost)
+            self.size = max(self.minimum, min(self.maximum, target, self.size * 2))
+
+
+class Batching:
+    """Per-endpoint AdaptiveBatchers, created on first use."""
+
+    def __init__(self, pinned: Optional[int] = None, caps: Optional[Dict[str, int]] = None,
+                 target_latency: float = 4.0):
+        self.pinned = pinned
+        self.caps = caps or DEFAULT_CAPS
+        self.target_latency = target_latency
+        self.batchers: Dict[str, AdaptiveBatcher] = {}
+        self._lock = threading.Lock()
+
+    def for_endpoint(self, endpoint: str) -> AdaptiveBatcher:
+        key = endpoint_key(endpoint)
+        with self._lock:
+            if key not in self.batchers:
+                self.batchers[key] = AdaptiveBatcher(
+                    maximum=self.caps.get(key, 100),
+                    target_latency=self.target_latency,
+                    pinned=self.pinned,
+                )
+            return self.batchers[key]
+
+    def sizes(self) -> Dict[str, int]:
+        with self._lock:
+            return {key: batcher.size for key, batcher in self.batchers.items()}
@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from .diff import RemoteIndex, title_key
+from .models import Movie
+
+ID_CACHE_FILE = "id_cache.sqlite"
+
+ID_FIELDS = ("trakt", "tmdb", "imdb", "slug")
+
+
+class IDCache:
+    """
+    Persistent Letterboxd URI -> Trakt IDs cache backed by SQLite.
+
+    Entries expire after `ttl` seconds (`negative_ttl` for titles Trakt could
+    not match) and the least recently used ones are evicted beyond
+    `max_entries` when the cache is closed.
+
+    Args:
+        path: SQLite database file.
+        max_entries: Maximum number of URIs kept.
+        ttl: Lifetime of a resolved entry, in seconds.
+        negative_ttl: Lifetime of a not-found entry, in seconds.
+    """
+
+    def __init__(self, path: str = ID_CACHE_FILE, max_entries: int = 100000,
+                 ttl: float = 180 * 86400, negative_ttl: float = 7 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Shared by parallel --batch runs: WAL keeps readers and the writer
+        # out of each other's way, every write commits at once, and the
+        # timeout covers the short waits that remain.
+        self.db = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS ids ("
+            " uri TEXT PRIMARY KEY,"
+            " trakt INTEGER, tmdb INTEGER, imdb TEXT, slug TEXT,"
+            " title TEXT, year INTEGER,"
+            " found INTEGER NOT NULL,"
+            " resolved_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def _lookup(self, uri: str) -> Optional[tuple]:
+        row = self.db.execute(
+            "SELECT trakt, tmdb, imdb, slug, found, resolved_at FROM ids WHERE uri = ?", (uri,)
+        ).fetchone()
+        if row is None:
+            return None
+        ttl = self.ttl if row[4] else self.negative_ttl
+        if time.time() - row[5] > ttl:
+            return None
+        return row
+
+    def get(self, uri: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached IDs for `uri`, or None on a miss or negative entry."""
+        with self._lock:
+            row = self._lookup(uri)
+            if row is None or not row[4]:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[uri] = time.time()
+        return {key: value for key, value in zip(ID_FIELDS, row) if value is not None}
+
+    def is_not_found(self, uri: str) -> bool:
+        with self._lock:
+            row = self._lookup(uri)
+        return row is not None and not row[4]
+
+    def put(self, uri: str, ids: Dict[str, Any], title: Optional[str] = None, year: Optional[int] = None):
+        ids = {key: ids.get(key) for key in ID_FIELDS}
+        if not any(ids.values()):
+            return
+        self._store(uri, ids, title, year, found=True)
+
+    def put_not_found(self, uri: str, title: Optional[str] = None, year: Optional[int] = None):
+        self._store(uri, {}, title, year, found=False)
+
+    def _store(self, uri, ids, title, year, found):
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO ids VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (uri, ids.get("trakt"), ids.get("tmdb"), ids.get("imdb"), ids.get("slug"),
+                 title, year, int(found), now, now),
+            )
+            self.db.commit()
+
+    def annotate(self, movies: Iterable[Movie]) -> Iterator[Movie]:
+        """Attaches cached IDs to each movie as it passes through."""
+        for movie in movies:
+            if movie.ids is None:
+                movie.ids = self.get(movie.uri)
+            yield movie
+
+    def resolve_from(self, movies: Iterable[Movie], remote: RemoteIndex) -> Iterator[Movie]:
+        """Takes IDs for unresolved movies from an already fetched collection."""
+        for movie in movies:
+            if not movie.ids:
+                ids = remote.ids_of(movie)
+                if ids:
+                    movie.ids = ids
+                    self.put(movie.uri, ids, movie.title, movie.year)
+            yield movie
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def flush(self):
+        with self._lock:
+            self.db.commit()
+
+    def prune(self):
+        """Drops expired entries and evicts the least recently used beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            if self._touched:
+                self.db.executemany(
+                    "UPDATE ids SET last_used = ? WHERE uri = ?",
+                    [(used, uri) for uri, used in self._touched.items()],
+                )
+                self._touched.clear()
+            self.db.execute(
+                "DELETE FROM ids WHERE (found = 1 AND resolved_at < ?) OR (found = 0 AND resolved_at < ?)",
+                (now - self.ttl, now - self.negative_ttl),
+            )
+            self.db.execute(
+                "DELETE FROM ids WHERE uri NOT IN (SELECT uri FROM ids ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self.db.commit()
+
+    def close(self):
+        self.prune()
+        self.db.close()
+
+
+def not_found_keys(responses: Optional[Iterable[Optional[Dict]]]) -> Set[str]:
+    """title_key()s of the movies listed under `not_found` in sync responses."""
+    keys = set()
+    for response in responses or []:
+        for item in (response or {}).get("not_found", {}).get("movies", []):
+            keys.add(title_key(item.get("title") or "", item.get("year")))
+    return keys
+
+
+def learn_ids(cache: IDCache, movies: Iterable[Movie], responses: Optional[List[Optional[Dict]]] = None,
+              fetch: Optional[Callable[[], Any]] = None):
+    """
+    Fills the cache after a sync phase.
+
+    Movies listed under `not_found` in the sync responses are cached as
+    negative entries. Trakt's `added`/`existing` sections only carry counts,
+    so IDs for the remaining unresolved movies are read from the collection
+    itself with one call to `fetch`.
+    """
+    not_found = not_found_keys(responses)
+    unresolved = []
+    for movie in movies:
+        if movie.ids:
+            continue
+        if title_key(movie.title, movie.year) in not_found:
+            cache.put_not_found(movie.uri, movie.title, movie.year)
+        else:
+            unresolved.append(movie)
+
+    if unresolved and fetch is not None:
+        for _ in cache.resolve_from(unresolved, RemoteIndex(fetch() or [])):
+            pass
+    cache.flush()
@@ -0,0 +1,140 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .diff import title_key
+from .models import Movie
+from .parser import CsvSource, parse_csv_columns
+from .watermark import Watermark
+
+
+def film_key(uri: str, title: str, year: Optional[int]) -> str:
+    """Letterboxd URI, or title and year for rows exported without one."""
+    return uri or title_key(title, year)
+
+
+def dedupe_key(sync_type: str, movie: Movie) -> Tuple:
+    """
+    Rows of one export that would turn into the same payload item: one entry
+    per film, except watched history where each distinct date is its own play.
+    """
+    key = film_key(movie.uri, movie.title, movie.year)
+    return (key, movie.watched_at) if sync_type == 'watched' else (key,)
+
+
+def dedupe(movies: Iterable[Movie], sync_type: str, window: Optional[int] = None) -> Iterator[Movie]:
+    """
+    Drops repeated rows as they stream past, keeping the first one. With a
+    `window`, only the keys of the last `window` distinct rows are remembered,
+    so memory stays bounded but repeats further apart get through.
+    """
+    seen: "OrderedDict[Tuple, None]" = OrderedDict()
+    for movie in movies:
+        key = dedupe_key(sync_type, movie)
+        if key in seen:
+            continue
+        seen[key] = None
+        if window is not None and len(seen) > window:
+            seen.popitem(last=False)
+        yield movie
+
+
+class CatalogView:
+    """
+    The rows of one export file, stored as indexes into the catalog's films
+    plus the per-row rating and watch date. Iterating yields Movies sharing
+    the film's title, year, URI and IDs.
+    """
+
+    def __init__(self, catalog: "Catalog", sync_type: str):
+        self.catalog = catalog
+        self.sync_type = sync_type
+        self.refs: List[int] = []
+        self.ratings: List[Optional[float]] = []
+        self.watched_at: List[Optional[str]] = []
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def __iter__(self) -> Iterator[Movie]:
+        films = self.catalog.films
+        if self.sync_type in ('watchlist', 'likes'):
+            # Nothing per row: hand out the shared film itself, so IDs
+            # resolved while syncing land on the catalog entry directly.
+            for ref in self.refs:
+                yield films[ref]
+            return
+        for ref, rating, watched_at in zip(self.refs, self.ratings, self.watched_at):
+            film = films[ref]
+            yield Movie(film.title, film.year, film.uri, rating, watched_at, film.ids)
+
+
+class Catalog:
+    """
+    Every film of a Letterboxd export, parsed once per run and keyed by
+    Letterboxd URI. Sync types keep CatalogViews referencing these films by
+    index instead of holding their own copies, so a film that is watched,
+    rated and liked exists once and is looked up in the ID cache once.
+
+    Args:
+        annotate: Called with films that still lack IDs when a file is
+            loaded, e.g. IDCache.annotate.
+    """
+
+    def __init__(self, annotate: Optional[Callable[[Iterable[Movie]], Iterable[Movie]]] = None):
+        self.annotate = annotate
+        self.films: List[Movie] = []
+        self.index: Dict[str, int] = {}
+        self.views: Dict[str, CatalogView] = {}
+        self._annotated = 0
+        # Phases may load their files concurrently under the run scheduler.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.films)
+
+    def _intern(self, title: str, year: int, uri: str) -> int:
+        key = film_key(uri, title, year)
+        ref = self.index.get(key)
+        if ref is None:
+            ref = len(self.films)
+            self.films.append(Movie(title, year, uri))
+            self.index[key] = ref
+        return ref
+
+    def load(self, source: CsvSource, sync_type: str, watermark: Optional[Watermark] = None) -> CatalogView:
+        """Parses one export file (past `watermark`) into a view, dropping repeated rows."""
+        batch = parse_csv_columns(source, sync_type, watermark)
+        with self._lock:
+            view = CatalogView(self, sync_type)
+            seen = set()
+            for title, year, uri, rating, watched_at in zip(
+                    batch.titles, batch.years, batch.uris, batch.ratings, batch.watched_at):
+                ref = self._intern(title, year, uri)
+                key = (ref, watched_at) if sync_type == 'watched' else ref
+                if key in seen:
+                    view.duplicates += 1
+                    continue
+                seen.add(key)
+                view.refs.append(ref)
+                view.ratings.append(rating)
+                view.watched_at.append(watched_at)
+
+            if self.annotate:
+                # Films are appended in order, so the ones added by this file
+                # are exactly those not looked up yet. IDs a later phase learns
+                # reach the films through adopt_ids rather than the cache.
+                for _ in self.annotate(self.films[self._annotated:]):
+                    pass
+                self._annotated = len(self.films)
+            self.views[sync_type] = view
+        return view
+
+    def adopt_ids(self, movies: Iterable[Movie]):
+        """Copies IDs resolved on yielded rows back onto their catalog films."""
+        with self._lock:
+            for movie in movies:
+                if movie.ids:
+                    ref = self.index.get(film_key(movie.uri, movie.title, movie.year))
+                    if ref is not None and not self.films[ref].ids:
+                        self.films[ref].ids = movie.ids
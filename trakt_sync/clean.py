@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from .api import TraktAPI
+from .scheduler import Scheduler
+
+# collection -> (paginated endpoint, TraktAPI removal method, what it holds)
+COLLECTIONS = {
+    "watchlist": ("/sync/watchlist", "remove_from_watchlist", "watchlist items"),
+    "ratings": ("/sync/ratings", "remove_ratings", "ratings"),
+    "history": ("/sync/history", "remove_history", "history items"),
+}
+
+
+def purge(api: TraktAPI, collection: str) -> int:
+    """
+    Removes everything in one collection, returning how many items it held.
+    Pages are read last to first and handed to the removal as they arrive,
+    so the first removal batch goes out while earlier pages are still loading.
+    """
+    endpoint, remove, noun = COLLECTIONS[collection]
+    total = api.count_items(endpoint)
+    if not total:
+        print(f"No {noun} found.")
+        return 0
+    print(f"Found {total} {noun}, removing...")
+    results = getattr(api, remove)(item for page in api.iter_pages(endpoint, reverse=True) for item in page)
+    api.metrics.observe_results(collection, results)
+    return total
+
+
+def clean_account(api: TraktAPI, list_name: Optional[str] = None, workers: int = 1,
+                  passes: int = 3) -> Dict[str, int]:
+    """
+    Empties the watchlist, ratings and history at once, all three feeding one
+    Scheduler so their removal requests share the rate budget, and deletes
+    the list named `list_name`. Each collection is counted again afterwards
+    and purged once more while anything is left, up to `passes` times.
+    Returns the number of items still remaining per collection.
+    """
+    remaining = {collection: None for collection in COLLECTIONS}
+    with Scheduler(workers=workers) as scheduler:
+        api.scheduler = scheduler
+        try:
+            with ThreadPoolExecutor(max_workers=len(COLLECTIONS) + 1) as executor:
+                if list_name:
+                    deleting = executor.submit(delete_list_named, api, list_name)
+                for attempt in range(passes):
+                    todo = [c for c, left in remaining.items() if left is None or left > 0]
+                    if not todo:
+                        break
+                    if attempt:
+                        print(f"Still left: {', '.join(f'{c}={remaining[c]}' for c in todo)}. Purging again...")
+                    list(executor.map(lambda c: purge(api, c), todo))
+                    for collection, count in zip(todo, executor.map(
+                            lambda c: api.count_items(COLLECTIONS[c][0]), todo)):
+                        remaining[collection] = count
+                if list_name:
+                    deleting.result()
+        finally:
+            api.scheduler = None
+    return remaining
+
+
+def delete_list_named(api: TraktAPI, list_name: str):
+    target = next((l for l in api.get_user_lists() or [] if l['name'] == list_name), None)
+    if target:
+        print(f"Deleting list '{list_name}'...")
+        api.delete_list(target['ids']['trakt'])
+    else:
+        print(f"List '{list_name}' not found.")
@@ -0,0 +1,115 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from .source import ExportSource, is_export
+
+
+class ExportWatcher:
+    """
+    Finds export files that changed since they were last synced.
+
+    `directory` is either an export (directory or zip) itself or a drop
+    folder holding several `letterboxd-*` exports, in which case the most
+    recently modified one is watched. A file counts as changed when its
+    content hash differs from the one last synced; the hash is only computed
+    when the file's mtime or size moved, so an idle check costs one stat()
+    per file.
+
+    Args:
+        directory: Export directory or drop folder.
+        files: sync type -> file name inside an export.
+    """
+
+    def __init__(self, directory: str, files: Dict[str, str]):
+        self.directory = directory
+        self.files = files
+        self._stats: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._synced: Dict[str, str] = {}
+
+    def export_dir(self) -> Optional[str]:
+        if not os.path.isdir(self.directory) or any(
+                os.path.exists(os.path.join(self.directory, name)) for name in self.files.values()):
+            return self.directory
+        exports = [os.path.join(self.directory, item) for item in os.listdir(self.directory)
+                   if item.startswith("letterboxd-") and is_export(os.path.join(self.directory, item))]
+        return max(exports, key=os.path.getmtime) if exports else None
+
+    def changed(self, export_dir: str, sync_types: List[str]) -> Dict[str, str]:
+        """Returns sync type -> content hash for the files needing a sync."""
+        changed = {}
+        with ExportSource(export_dir) as source:
+            for sync_type in sync_types:
+                name = self.files[sync_type]
+                if not source.exists(name):
+                    continue
+                key = (export_dir, name)
+                stat = source.stat(name)
+                if self._stats.get(key) == stat:
+                    continue
+                digest = source.fingerprint(name)
+                self._stats[key] = stat
+                # Keyed by file name, so a new export in the drop folder whose
+                # file didn't change (e.g. likes) isn't synced again.
+                if self._synced.get(name) != digest:
+                    changed[sync_type] = digest
+        return changed
+
+    def mark_synced(self, hashes: Dict[str, str]):
+        for sync_type, digest in hashes.items():
+            self._synced[self.files[sync_type]] = digest
+
+    def forget(self, export_dir: str, sync_types: List[str]):
+        """Makes the next check look at these files again, e.g. after a failed sync."""
+        for sync_type in sync_types:
+            self._stats.pop((export_dir, self.files[sync_type]), None)
+
+
+def run_daemon(sync: Callable[[str, List[str]], Optional[bool]], directory: str, files: Dict[str, Tuple[str, str]],
+               interval: float = 300.0, wanted: Optional[List[str]] = None, cycles: Optional[int] = None):
+    """
+    Checks `directory` every `interval` seconds and calls sync(export_dir,
+    sync_types) for the exports that changed. Runs until interrupted (or for
+    `cycles` checks). The caller's API session, caches and rate limiter stay
+    alive between cycles, so each cycle starts warm.
+
+    Args:
+        sync: Runs the sync for the given export directory and sync types;
+            returning False (or raising) has them tried again next cycle.
+        directory: Export directory or drop folder, see ExportWatcher.
+        files: sync type -> (file name, description), as main.SYNC_FILES.
+        interval: Seconds between checks.
+        wanted: Sync types to watch; all of `files` by default.
+        cycles: Stop after this many checks.
+    """
+    watcher = ExportWatcher(directory, {sync_type: spec[0] for sync_type, spec in files.items()})
+    wanted = wanted or list(files)
+    print(f"Watching {directory} every {interval:.0f}s (Ctrl+C to stop)...")
+    checks = 0
+    try:
+        while cycles is None or checks < cycles:
+            checks += 1
+            export_dir = None
+            try:
+                export_dir = watcher.export_dir()
+                changed = watcher.changed(export_dir, wanted) if export_dir else {}
+            except Exception as e:
+                # E.g. an export still being copied into place: a truncated
+                # zip or a file vanishing between listing and reading.
+                print(f"Check failed, will retry next cycle: {e}")
+                if export_dir:
+                    watcher.forget(export_dir, wanted)
+                changed = {}
+            if changed:
+                print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Changed in {export_dir}: "
+                      f"{', '.join(changed)}")
+                try:
+                    if sync(export_dir, list(changed)) is False:
+                        raise RuntimeError("not every sync type went through")
+                    watcher.mark_synced(changed)
+                except Exception as e:
+                    print(f"Sync failed, will retry next cycle: {e}")
+                    watcher.forget(export_dir, list(changed))
+            if cycles is None or checks < cycles:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopping daemon.")
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+DEAD_LETTER_FILE = "failed_items.jsonl"
+
+
+class DeadLetterQueue:
+    """
+    On-disk JSONL queue of payload items Trakt rejected: items still failing
+    once their chunk was split down to single items, and whole chunks that
+    failed in a way splitting can't fix. Each line keeps the endpoint and
+    payload key so the item can be replayed as-is later.
+    """
+
+    def __init__(self, path: str = DEAD_LETTER_FILE):
+        self.path = path
+        self.added = 0
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, key: str, item: Any, status: Optional[int], error: str = ""):
+        entry = {
+            "endpoint": endpoint,
+            "key": key,
+            "item": item,
+            "status": status,
+            "error": error[:500],
+            "at": time.time(),
+        }
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.added += 1
+
+    def take(self) -> List[Dict[str, Any]]:
+        """
+        Moves the queued entries out of the queue file and returns them.
+        Entries that fail again are added back by the replay itself; a run
+        interrupted mid-replay picks the leftovers up on the next take().
+        """
+        replaying = self.path + ".replaying"
+        with self._lock:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as src, \
+                        open(replaying, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(self.path)
+        entries = []
+        if os.path.exists(replaying):
+            with open(replaying, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return entries
+
+    def done_replaying(self):
+        replaying = self.path + ".replaying"
+        if os.path.exists(replaying):
+            os.remove(replaying)
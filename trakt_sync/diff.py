@@ -0,0 +1,101 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .models import Movie
+
+ID_KEYS = ("trakt", "tmdb", "imdb", "slug")
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def title_key(title: str, year: Optional[int]) -> Tuple[str, Optional[int]]:
+    """Normalized (title, year) key, tolerant of case and punctuation differences."""
+    return _NON_WORD.sub(" ", title.casefold()).strip(), year
+
+
+class RemoteIndex:
+    """
+    In-memory index over items fetched from a Trakt collection
+    (/sync/watchlist, /sync/ratings, /sync/history).
+
+    Movies are looked up by any of their IDs first and by normalized
+    title+year otherwise, since Letterboxd exports carry no Trakt IDs.
+    """
+
+    def __init__(self, items: Optional[Iterable[Dict]] = None):
+        self.by_id: Dict[Tuple[str, object], Tuple] = {}
+        self.by_title: Dict[Tuple[str, Optional[int]], Tuple] = {}
+        self.ratings: Dict[Tuple, int] = {}
+        self.plays: Dict[Tuple, Set[str]] = defaultdict(set)
+        self.ids: Dict[Tuple, Dict] = {}
+        self.count = 0
+        for item in items or []:
+            self.add(item)
+
+    def add(self, item: Dict):
+        movie = item.get("movie")
+        if not movie:
+            return
+        self.count += 1
+        ids = movie.get("ids") or {}
+        key = self.find(movie.get("title") or "", movie.get("year"), ids)
+        if key is None:
+            key = ("trakt", ids["trakt"]) if ids.get("trakt") else title_key(movie.get("title") or "", movie.get("year"))
+        for id_key in ID_KEYS:
+            if ids.get(id_key):
+                self.by_id[(id_key, ids[id_key])] = key
+        if ids:
+            self.ids.setdefault(key, ids)
+        if movie.get("title"):
+            self.by_title.setdefault(title_key(movie["title"], movie.get("year")), key)
+        if item.get("rating") is not None:
+            self.ratings[key] = item["rating"]
+        if item.get("watched_at"):
+            self.plays[key].add(item["watched_at"][:10])
+
+    def find(self, title: str, year: Optional[int], ids: Optional[Dict] = None) -> Optional[Tuple]:
+        """Returns the index key of the matching remote movie, or None."""
+        for id_key in ID_KEYS:
+            if ids and ids.get(id_key) and (id_key, ids[id_key]) in self.by_id:
+                return self.by_id[(id_key, ids[id_key])]
+        return self.by_title.get(title_key(title, year))
+
+    def _find_movie(self, movie: Movie) -> Optional[Tuple]:
+        return self.find(movie.title, movie.year, movie.ids)
+
+    def __contains__(self, movie: Movie) -> bool:
+        return self._find_movie(movie) is not None
+
+    def rating_of(self, movie: Movie) -> Optional[int]:
+        key = self._find_movie(movie)
+        return self.ratings.get(key) if key else None
+
+    def ids_of(self, movie: Movie) -> Optional[Dict]:
+        key = self._find_movie(movie)
+        return self.ids.get(key) if key else None
+
+    def plays_of(self, movie: Movie) -> Set[str]:
+        key = self._find_movie(movie)
+        return self.plays[key] if key in self.plays else set()
+
+
+def missing_from_watchlist(movies: Iterable[Movie], index: RemoteIndex) -> Iterator[Movie]:
+    return (m for m in movies if m not in index)
+
+
+def changed_ratings(movies: Iterable[Movie], index: RemoteIndex) -> Iterator[Movie]:
+    return (m for m in movies if m.rating and index.rating_of(m) != int(m.rating * 2))
+
+
+def new_history_plays(movies: Iterable[Movie], index: RemoteIndex) -> Iterator[Movie]:
+    """Plays whose (movie, watch date) is not already recorded on Trakt."""
+    seen = set()
+    for m in movies:
+        if not m.watched_at:
+            continue
+        date = m.watched_at[:10]
+        if date in index.plays_of(m) or (m.uri, date) in seen:
+            continue
+        seen.add((m.uri, date))
+        yield m
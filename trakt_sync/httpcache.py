@@ -0,0 +1,178 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .batching import endpoint_key
+
+HTTP_CACHE_FILE = "http_cache.sqlite"
+
+# endpoint_key() -> seconds a cached body is served without asking Trakt.
+# Past that it is revalidated with If-None-Match / If-Modified-Since, so a
+# collection that didn't change costs a 304 instead of the full download.
+DEFAULT_TTLS = {
+    "/users/settings": 86400,
+    "/users/me/lists": 300,
+    "/sync/watchlist": 300,
+    "/sync/ratings": 300,
+    "/sync/history": 300,
+    "/search/movie": 86400,
+}
+
+# Write endpoint prefix -> cached GET prefixes it makes stale.
+INVALIDATES = {
+    "/sync/watchlist": ("/sync/watchlist",),
+    "/sync/ratings": ("/sync/ratings",),
+    # Trakt takes movies off the watchlist once they are watched.
+    "/sync/history": ("/sync/history", "/sync/watchlist"),
+    "/users/me/lists": ("/users/me/lists",),
+}
+
+# Response headers kept with the body: validators and pagination.
+KEPT_HEADERS = ("ETag", "Last-Modified", "X-Pagination-Page-Count", "X-Pagination-Item-Count")
+
+
+class CachedResponse:
+    """A stored 200 response, read like the requests.Response it came from."""
+
+    status_code = 200
+
+    def __init__(self, content: bytes, headers: Dict[str, str], fetched_at: float):
+        self.content = content
+        self.headers = headers
+        self.fetched_at = fetched_at
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def validators(self) -> Dict[str, str]:
+        """Headers turning a GET into a conditional one."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk cache of GET responses backed by SQLite, per account.
+
+    Entries younger than their endpoint's TTL are served without a request;
+    older ones are revalidated with a conditional GET. Every write to Trakt
+    invalidates the entries it can affect (see INVALIDATES), and a response
+    fetched while such a write was in flight is not stored, as it may
+    predate the write.
+
+    Args:
+        path: SQLite database file.
+        ttls: endpoint_key() -> freshness lifetime in seconds; endpoints not
+            listed are revalidated on every use.
+        max_age: Entries not refreshed for this many seconds are dropped.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_FILE, ttls: Optional[Dict[str, float]] = None,
+                 max_age: float = 30 * 86400):
+        self.path = path
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        # scope -> writes seen so far, see put().
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        # Shared by parallel --batch runs; see IDCache.
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " scope TEXT NOT NULL,"
+            " endpoint TEXT NOT NULL,"
+            " headers TEXT NOT NULL,"
+            " content BLOB NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (scope, endpoint))"
+        )
+        self.db.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - max_age,))
+        self.db.commit()
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint_key(endpoint), 0)
+
+    def get(self, scope: str, endpoint: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT headers, content, fetched_at FROM responses WHERE scope = ? AND endpoint = ?",
+                (scope, endpoint),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[1], json.loads(row[0]), row[2])
+
+    def is_fresh(self, entry: CachedResponse, endpoint: str) -> bool:
+        return time.time() - entry.fetched_at < self.ttl(endpoint)
+
+    def put(self, scope: str, endpoint: str, response, generation: int):
+        """Stores a 200 response, unless a write happened since `generation` was read."""
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        with self._lock:
+            if generation != self._generations.get(scope, 0):
+                return
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (scope, endpoint, json.dumps(headers), response.content, time.time()),
+            )
+            self.db.commit()
+
+    def touch(self, scope: str, endpoint: str):
+        """Marks an entry as just revalidated (a 304)."""
+        with self._lock:
+            self.db.execute(
+                "UPDATE responses SET fetched_at = ? WHERE scope = ? AND endpoint = ?",
+                (time.time(), scope, endpoint),
+            )
+            self.db.commit()
+
+    def invalidate(self, scope: str, endpoint: str):
+        """Drops what a write to `endpoint` makes stale; unknown writes drop the whole scope."""
+        path = endpoint.split("?", 1)[0]
+        prefixes = next((stale for prefix, stale in INVALIDATES.items() if path.startswith(prefix)), ("",))
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            for prefix in prefixes:
+                self.db.execute(
+                    "DELETE FROM responses WHERE scope = ? AND substr(endpoint, 1, ?) = ?",
+                    (scope, len(prefix), prefix),
+                )
+            self.db.commit()
+
+    def fetch(self, scope: str, endpoint: str, send: Callable[[Dict[str, str]], Any]):
+        """
+        GETs `endpoint` through the cache; send(headers) performs the request.
+        Returns the response (cached or live), or None if send() gave none.
+        """
+        entry = self.get(scope, endpoint)
+        if entry is not None and self.is_fresh(entry, endpoint):
+            with self._lock:
+                self.hits += 1
+            return entry
+        with self._lock:
+            generation = self._generations.get(scope, 0)
+        response = send(entry.validators() if entry is not None else {})
+        if response is not None and response.status_code == 304 and entry is not None:
+            self.touch(scope, endpoint)
+            with self._lock:
+                self.revalidated += 1
+            return entry
+        with self._lock:
+            self.misses += 1
+        if response is not None and response.status_code == 200:
+            self.put(scope, endpoint, response, generation)
+        return response
+
+    def close(self):
+        with self._lock:
+            self.db.close()
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+JOURNAL_DIR = ".trakt_journal"
+
+
+def item_fingerprint(item: Dict[str, Any]) -> str:
+    """
+    Content fingerprint of one payload item. IDs are left out so an item keeps
+    its fingerprint whether or not the ID cache resolved it on that run.
+    """
+    content = {key: value for key, value in item.items() if key != "ids"}
+    data = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+class Journal:
+    """
+    Append-only, crash-safe record of the chunks Trakt acknowledged for one
+    (account, export file, sync type).
+
+    Each acknowledged chunk is written as one JSON line listing the
+    fingerprints of its items and fsync'ed before the next one is recorded, so
+    after a crash the journal holds exactly the work already committed.
+    Tracking items rather than chunk boundaries keeps resume correct even if a
+    later run splits the export into differently sized chunks.
+
+    Args:
+        path: Journal file.
+        resume: Keep (and honor) what is already in the file; otherwise start
+            a fresh journal.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._load()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    @classmethod
+    def open(cls, account: str, export_path: str, sync_type: str,
+             directory: str = JOURNAL_DIR, resume: bool = False) -> "Journal":
+        key = f"{account}|{os.path.abspath(export_path)}|{sync_type}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        safe_account = re.sub(r"[^\w.-]+", "_", account)
+        return cls(os.path.join(directory, f"{safe_account}-{sync_type}-{digest}.jsonl"), resume=resume)
+
+    def _load(self):
+        complete = 0
+        with open(self.path, "rb+") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn last line from a crash mid-write; that chunk was
+                    # never fully recorded, so it will simply be re-sent.
+                    break
+                complete += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.done.update(entry.get("items", []))
+            # Cut the torn line off, or the next record would be appended
+            # to it and lost as well.
+            f.truncate(complete)
+
+    def pending(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Drops items already acknowledged from `payload`.
+        Returns the remaining payload and the fingerprints of its items.
+        """
+        remaining = {}
+        fingerprints = []
+        for key, items in payload.items():
+            if not isinstance(items, list):
+                remaining[key] = items
+                continue
+            kept = []
+            for item in items:
+                fp = item_fingerprint(item) if isinstance(item, dict) else str(item)
+                if fp not in self.done:
+                    kept.append(item)
+                    fingerprints.append(fp)
+            remaining[key] = kept
+        return remaining, fingerprints
+
+    def record(self, endpoint: str, fingerprints: List[str]):
+        entry = {"endpoint": endpoint, "items": fingerprints, "at": time.time()}
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.done.update(fingerprints)
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
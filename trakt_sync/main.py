@@ -1,17 +1,34 @@
 import argparse
 import os
 import json
-from .auth import authenticate
-from .api import TraktAPI
+import sys
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from .auth import authenticate, TOKEN_FILE
+from .batch import run_batch, BATCH_LOG_DIR
+from .api import ListUnavailable, TraktAPI, TraktUnavailable
+from .catalog import Catalog, dedupe
+from .clean import clean_account
+from .cache import IDCache, ID_CACHE_FILE, learn_ids
+from .deadletter import DeadLetterQueue, DEAD_LETTER_FILE
+from .httpcache import ResponseCache, HTTP_CACHE_FILE
+from .journal import Journal
+from .daemon import run_daemon
+from .diff import RemoteIndex, missing_from_watchlist, changed_ratings, new_history_plays
+from .transport import Transport
 from .parser import parse_csv
-
-def get_file_path(base_dir, filename):
-    return os.path.join(base_dir, filename)
+from .metrics import profiled
+from .pipeline import Tap, prefetch
+from .plan import apply_plan, manifest_path, write_plan
+from .watermark import WatermarkStore, WATERMARK_FILE
+from .resolve import resolve_not_found
+from .scheduler import Scheduler
+from .source import ExportSource, is_export
 
 def find_default_data_dir():
-    # Look for directory starting with 'letterboxd-' in current dir
+    # Look for an export starting with 'letterboxd-' in current dir, either
+    # extracted or the downloaded zip
     for item in os.listdir('.'):
-        if os.path.isdir(item) and item.startswith('letterboxd-'):
+        if item.startswith('letterboxd-') and is_export(item):
             return item
     return None
 
@@ -22,6 +39,22 @@ def get_input(prompt, default=None):
     else:
         return input(f"{prompt}: ").strip()
 
+def positive_int(value):
+    """A count that must be at least 1, e.g. --queue-size."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number, got '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def chunk_size(value):
+    """--chunk-size: 'auto' (adapt per endpoint) or a fixed number of items, at least 1."""
+    if value == "auto":
+        return None
+    return positive_int(value)
+
 CREDENTIALS_FILE = "credentials.json"
 
 def load_credentials():
@@ -37,16 +70,315 @@ def save_credentials(client_id, client_secret):
     with open(CREDENTIALS_FILE, 'w') as f:
         json.dump({"client_id": client_id, "client_secret": client_secret}, f)
 
+# sync type -> (export file, what its rows are called in messages)
+SYNC_FILES = {
+    'watchlist': ("watchlist.csv", "movies in watchlist"),
+    'ratings': ("ratings.csv", "ratings"),
+    'watched': ("watched.csv", "watched movies"),
+    'likes': ("likes/films.csv", "liked movies"),
+}
+
+DIFFS = {
+    'watchlist': missing_from_watchlist,
+    'ratings': changed_ratings,
+    'watched': new_history_plays,
+}
+
+def sync_file(api, sync_type, source, args, account, id_cache=None, list_name=None, catalog=None,
+              watermark=None):
+    name, noun = SYNC_FILES[sync_type]
+    path = source.describe(name)
+    with source.open(name) as stream:
+        return _sync_stream(api, sync_type, stream, path, noun, args, account, id_cache, list_name,
+                            catalog, watermark)
+
+def _sync_stream(api, sync_type, stream, path, noun, args, account, id_cache, list_name, catalog, watermark):
+    fetch = {
+        'watchlist': api.get_watchlist,
+        'ratings': api.get_ratings,
+        'watched': api.iter_history,
+    }.get(sync_type)
+
+    metrics = api.metrics
+    print(f"Reading {path}...")
+    if catalog is not None:
+        with metrics.timer(sync_type, "parse"):
+            movies = catalog.load(stream, sync_type, watermark)
+        if watermark and watermark.tail_only:
+            noun = f"new {noun} since the last import"
+        duplicates = f" ({movies.duplicates} repeated rows dropped)" if movies.duplicates else ""
+        print(f"Found {len(movies)} {noun}{duplicates}.")
+    else:
+        # Bounded like the prefetch queue, so memory doesn't grow with the file.
+        movies = dedupe(parse_csv(stream, sync_type, watermark), sync_type, window=args.queue_size)
+        if id_cache:
+            movies = id_cache.annotate(movies)
+        # Parsing runs ahead in its own thread; the first chunk goes out
+        # while the rest of the file is still being read.
+        movies = prefetch(movies, args.queue_size)
+
+    if args.incremental and fetch:
+        with metrics.timer(sync_type, "fetch"):
+            remote = RemoteIndex(fetch() or [])
+        if id_cache:
+            movies = id_cache.resolve_from(movies, remote)
+        movies = DIFFS[sync_type](movies, remote)
+        if not args.stream:
+            movies = list(movies)
+            print(f"{remote.count} already on Trakt, {len(movies)} new or changed to send.")
+
+    def send(movies, journal=None):
+        if sync_type == 'watchlist':
+            return api.sync_watchlist(movies, journal=journal)
+        elif sync_type == 'ratings':
+            return api.sync_ratings(movies, journal=journal)
+        elif sync_type == 'watched':
+            return api.sync_history(movies, journal=journal)
+        return api.sync_likes_to_list(movies, list_name=list_name, journal=journal)
+
+    # Only movies still lacking IDs are kept: the ones Trakt may not find,
+    # and the ones the cache can learn afterwards. --stream keeps a bounded
+    # number; the cache learns the rest on later runs.
+    tap = Tap(movies, keep=lambda m: not m.ids, limit=args.queue_size if args.stream else None)
+    # With --stream this includes parsing, which overlaps with sending.
+    with metrics.timer(sync_type, "send"), \
+            Journal.open(account, path, sync_type, resume=args.resume) as journal:
+        results = send(tap, journal=journal)
+    if args.stream:
+        if watermark and watermark.tail_only:
+            noun = f"new {noun} since the last import"
+        print(f"Streamed {tap.count} {noun}.")
+        if tap.overflow:
+            later = "; later runs pick them up" if id_cache else ""
+            print(f"{tap.overflow} more without Trakt IDs were not kept for search and ID caching "
+                  f"(limit --queue-size {args.queue_size}){later}.")
+
+    if not args.no_search:
+        with metrics.timer(sync_type, "search"):
+            matched = resolve_not_found(api, tap.kept, results, id_cache, workers=max(4, args.concurrency))
+        if matched:
+            # Not journaled: the journal ignores IDs, so it would take these
+            # for the not_found items it already recorded and skip them.
+            print(f"Re-sending {len(matched)} matched {noun} with their Trakt IDs...")
+            with metrics.timer(sync_type, "send"):
+                results = (results or []) + (send(matched) or [])
+    metrics.observe_results(sync_type, results)
+
+    if id_cache:
+        # Liked films are nearly always watched or rated as well, so their IDs
+        # come from those phases; for likes only not_found misses are recorded.
+        # A tail run reads a few new rows: downloading the whole collection
+        # for their IDs would cost more than the sync itself. Their IDs are
+        # learned on the next full read instead.
+        tail_only = watermark is not None and watermark.tail_only
+        with metrics.timer(sync_type, "learn_ids"):
+            learn_ids(id_cache, tap.kept, results, fetch=None if tail_only else fetch)
+        if catalog is not None:
+            catalog.adopt_ids(tap.kept)
+    return results
+
+def print_transport_summary(api):
+    stats = api.transport.summary()
+    print(f"HTTP: {stats['requests']} requests over {stats['connections_opened']} connections "
+          f"(avg {stats['avg_new_connection_ms']:.0f} ms on new connections, "
+          f"{stats['avg_reused_connection_ms']:.0f} ms on reused ones).")
+    cache = api.http_cache
+    if cache is not None and (cache.hits or cache.revalidated or cache.misses):
+        print(f"HTTP cache: {cache.hits} served locally, {cache.revalidated} unchanged on Trakt (304), "
+              f"{cache.misses} downloaded.")
+    sizes = api.batching.sizes()
+    if sizes:
+        print("Chunk sizes: " + ", ".join(f"{endpoint}={size}" for endpoint, size in sizes.items()))
+
+def write_metrics(api, args):
+    if args.metrics_json:
+        api.metrics.write_json(args.metrics_json)
+        print(f"Metrics written to {args.metrics_json}.")
+
+def print_dead_letters(api):
+    if api.dead_letters and api.dead_letters.added:
+        print(f"{api.dead_letters.added} items could not be synced; see {api.dead_letters.path}. "
+              f"Re-run with --retry-failed to send them again.")
+
+def sync_exports(api, args, data_dir, account, list_name=None, id_cache=None, catalog=None,
+                 watermarks=None, sync_types=None):
+    """
+    Runs the sync phases selected by --sync for the export at data_dir
+    (limited to sync_types if given). Returns False if a phase failed.
+    """
+    with ExportSource(data_dir) as source:
+        return _sync_source(api, args, source, account, list_name, id_cache, catalog, watermarks, sync_types)
+
+def _sync_source(api, args, source, account, list_name, id_cache, catalog, watermarks, sync_types):
+    phases = []
+    for sync_type in SYNC_FILES:
+        if args.sync not in (sync_type, 'all') or (sync_types is not None and sync_type not in sync_types):
+            continue
+        if source.exists(SYNC_FILES[sync_type][0]):
+            phases.append(sync_type)
+        else:
+            print(f"Warning: {source.describe(SYNC_FILES[sync_type][0])} not found.")
+
+    failed = []
+
+    def run_phase(sync_type):
+        name = SYNC_FILES[sync_type][0]
+        watermark = watermarks.get(account, name) if watermarks else None
+        try:
+            results = sync_file(api, sync_type, source, args, account, id_cache=id_cache, list_name=list_name,
+                                catalog=catalog, watermark=watermark)
+        except ListUnavailable as e:
+            # The other phases go on; this file is read again next time.
+            print(f"Error: {e}, {sync_type} not synced.")
+            failed.append(sync_type)
+            return None
+        if watermarks:
+            # Only moved once the rows were sent, so an interrupted run reads
+            # the same tail again next time.
+            watermarks.put(account, name, watermark)
+        return results
+
+    if len(phases) > 1 and not args.sequential_phases:
+        # All phases run at once and feed one run-wide queue of chunks, so
+        # requests keep going while a phase is still parsing or fetching.
+        with Scheduler(workers=args.concurrency) as scheduler:
+            api.scheduler = scheduler
+            executor = ThreadPoolExecutor(max_workers=len(phases))
+            futures = [executor.submit(run_phase, phase) for phase in phases]
+            try:
+                done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    future.result()
+            except BaseException:
+                # Ctrl-C or a failing phase: the other phases stop at their
+                # next chunk instead of sending the rest of their files.
+                scheduler.stop()
+                wait(futures)
+                raise
+            finally:
+                executor.shutdown(wait=False)
+                api.scheduler = None
+        stats = scheduler.summary()
+        print(f"Sent {stats['chunks']} chunks ({stats['items']} items) in {stats['seconds']:.1f}s.")
+    else:
+        for phase in phases:
+            run_phase(phase)
+    return not failed
+
+def get_data_dir(args):
+    data_dir = args.data_dir
+    if not data_dir:
+        default_dir = find_default_data_dir()
+        if not args.no_input:
+            data_dir = get_input("Letterboxd Data Directory", default_dir)
+        else:
+            data_dir = default_dir
+            
+    if not data_dir or not os.path.exists(data_dir):
+        print(f"Error: Data directory '{data_dir}' not found.")
+        return None
+    if not args.daemon and not is_export(data_dir):
+        print(f"Error: '{data_dir}' is neither an export directory nor a zip file.")
+        return None
+    return data_dir
+
+def get_list_name(args):
+    list_name = args.list_name
+    if args.sync in ['likes', 'all']:
+        if not list_name and not args.no_input:
+            list_name = get_input("Trakt List Name for Likes", "Favorites")
+        if not list_name:
+            list_name = "Favorites"
+    return list_name
+
+def make_plan(args):
+    """--plan: builds all request bodies offline, no credentials needed."""
+    data_dir = get_data_dir(args)
+    if not data_dir:
+        return False
+    list_name = get_list_name(args)
+    id_cache = None if args.no_id_cache else IDCache(args.id_cache)
+    catalog = Catalog(annotate=id_cache.annotate if id_cache else None)
+    with ExportSource(data_dir) as source:
+        files = {}
+        for sync_type, (name, _) in SYNC_FILES.items():
+            if args.sync not in (sync_type, 'all'):
+                continue
+            if source.exists(name):
+                files[sync_type] = name
+            else:
+                print(f"Warning: {source.describe(name)} not found.")
+        manifest = write_plan(args.plan, source, files, catalog, list_name=list_name,
+                              chunk_size=args.chunk_size)
+    if id_cache:
+        id_cache.close()
+    chunks = sum(section["chunks"] for section in manifest["sections"])
+    items = sum(section["items"] for section in manifest["sections"])
+    print(f"Plan written to {args.plan}: {items} items in {chunks} requests "
+          f"(manifest: {manifest_path(args.plan)}). Send it with --apply {args.plan}.")
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description="Sync Letterboxd export to Trakt")
     parser.add_argument("--client-id", help="Trakt Client ID")
     parser.add_argument("--client-secret", help="Trakt Client Secret")
-    parser.add_argument("--data-dir", help="Path to Letterboxd export directory")
+    parser.add_argument("--data-dir", help="Path to Letterboxd export directory or .zip")
     parser.add_argument("--sync", choices=['watchlist', 'ratings', 'watched', 'likes', 'all', 'clean'], default='all', help="What to sync (or clean)")
     parser.add_argument("--list-name", help="Name of the Trakt list for Likes")
     parser.add_argument("--no-input", action="store_true", help="Disable interactive prompts")
+    parser.add_argument("--pool-size", type=int, default=10, help="Max pooled HTTP connections to Trakt")
+    parser.add_argument("--timeout", type=float, default=60.0, help="HTTP read timeout in seconds")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of chunk requests kept in flight")
+    parser.add_argument("--chunk-size", type=chunk_size, default="auto", metavar="auto|N", help="Items per request: 'auto' adapts it per endpoint (default), a number pins it")
+    parser.add_argument("--incremental", action="store_true", help="Only send items missing or changed on Trakt")
+    parser.add_argument("--sequential-phases", action="store_true", help="With --sync all, finish each sync type before starting the next")
+    parser.add_argument("--stream", action="store_true", help="Parse and send concurrently instead of loading each file first")
+    parser.add_argument("--queue-size", type=positive_int, default=1000, help="Parsed rows buffered ahead of the network in --stream mode")
+    parser.add_argument("--new-rows-only", action="store_true", help="Only read rows added to each export since the last --new-rows-only run")
+    parser.add_argument("--watermarks", default=WATERMARK_FILE, help="Where --new-rows-only remembers how far each export was read")
+    parser.add_argument("--resume", action="store_true", help="Skip chunks already acknowledged by an interrupted run")
+    parser.add_argument("--id-cache", default=ID_CACHE_FILE, help="Path of the Letterboxd URI -> Trakt ID cache")
+    parser.add_argument("--no-id-cache", action="store_true", help="Don't read or update the ID cache")
+    parser.add_argument("--http-cache", default=HTTP_CACHE_FILE, help="Path of the cache of Trakt GET responses")
+    parser.add_argument("--no-http-cache", action="store_true", help="Always download Trakt collections and lists in full")
+    parser.add_argument("--no-search", action="store_true", help="Don't search Trakt for titles it reported as not found")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and sync exports whenever they change")
+    parser.add_argument("--interval", type=float, default=300.0, help="Seconds between checks for changed exports in --daemon mode")
+    parser.add_argument("--failed-file", default=DEAD_LETTER_FILE, help="Where items Trakt keeps rejecting are written")
+    parser.add_argument("--retry-failed", action="store_true", help="Only re-send the items recorded in --failed-file")
+    parser.add_argument("--plan", metavar="FILE", help="Build every request offline and write them to this plan file instead of syncing")
+    parser.add_argument("--apply", metavar="FILE", help="Send a plan file written by --plan")
+    parser.add_argument("--token-file", default=TOKEN_FILE, help="Where the Trakt access token is read from and saved")
+    parser.add_argument("--batch", metavar="MANIFEST", help="Sync several accounts in parallel, as listed in this JSON manifest")
+    parser.add_argument("--workers", type=int, default=4, help="Accounts synced at the same time in --batch mode")
+    parser.add_argument("--batch-logs", default=BATCH_LOG_DIR, help="Where --batch writes each account's log, metrics and failed items")
+    parser.add_argument("--account-timeout", type=float, help="In --batch mode, stop an account's run after this many seconds")
+    parser.add_argument("--metrics-json", help="Write request, retry, item and phase timing metrics to this JSON file")
+    parser.add_argument("--profile", help="Write a cProfile dump of the run to this file")
     
     args = parser.parse_args()
+    if args.batch:
+        return 0 if run_batch(parser, args) else 1
+    with profiled(args.profile):
+        try:
+            return 0 if run(args) else 1
+        except TraktUnavailable as e:
+            print(f"Error: Trakt is not responding, stopping: {e}")
+            if args.retry_failed or args.apply or args.sync == 'clean':
+                print(f"Items of the failing requests are in {args.failed_file}; "
+                      f"send them with --retry-failed once Trakt is back.")
+            else:
+                print("Once Trakt is back, run the same command again with --resume: it skips "
+                      "what Trakt already acknowledged and sends the rest.")
+            return 1
+        except KeyboardInterrupt:
+            print("\nInterrupted. Run the same command again with --resume to send the rest.")
+            return 130
+
+def run(args):
+    """Runs what args ask for; False if it had to stop on an error."""
+    if args.plan:
+        return make_plan(args)
 
     # 1. Credentials
     c_id = args.client_id or os.environ.get("TRAKT_CLIENT_ID")
@@ -80,7 +412,7 @@ def main():
             
     if not c_id or not c_secret:
         print("Error: Client ID and Secret are required.")
-        return
+        return False
         
     # Save credentials if they work? Or just save them now? 
     # Let's save them now. Validating them happens during auth.
@@ -92,12 +424,37 @@ def main():
     # 2. Authentication
     print("Authenticating...")
     try:
-        token = authenticate(c_id, c_secret)
+        token = authenticate(c_id, c_secret, args.token_file)
     except Exception as e:
         print(f"Authentication failed: {e}")
-        return
+        return False
         
-    api = TraktAPI(token, c_id)
+    transport = Transport(pool_size=max(args.pool_size, args.concurrency), timeout=(5.0, args.timeout))
+    api = TraktAPI(token, c_id, transport=transport, concurrency=args.concurrency,
+                   chunk_size=args.chunk_size, base_url=os.environ.get("TRAKT_API_URL", "https://api.trakt.tv"),
+                   dead_letters=DeadLetterQueue(args.failed_file),
+                   http_cache=None if args.no_http_cache else ResponseCache(args.http_cache))
+
+    if args.retry_failed:
+        count = api.retry_failed()
+        print(f"Retried {count} previously failed items.")
+        print_dead_letters(api)
+        print_transport_summary(api)
+        write_metrics(api, args)
+        return True
+
+    if args.apply:
+        try:
+            apply_plan(api, args.apply, list_name=args.list_name,
+                       sync_types=None if args.sync == 'all' else [args.sync])
+        except (OSError, ValueError) as e:
+            print(f"Error: can't apply plan: {e}")
+            return False
+        print_dead_letters(api)
+        print_transport_summary(api)
+        write_metrics(api, args)
+        print("Done!")
+        return True
 
     # 3. Clean Account
     if args.sync == 'clean':
@@ -108,123 +465,72 @@ def main():
             confirmation = get_input("Type 'DELETE_EVERYTHING' to confirm")
             if confirmation != "DELETE_EVERYTHING":
                 print("Confirmation failed. Aborting.")
-                return
+                return False
         
-        print("Proceeding with account cleanup...")
-        
-        # 1. Watchlist
-        print("Fetching Watchlist...")
-        watchlist = api.get_watchlist()
-        if watchlist:
-            print(f"Found {len(watchlist)} items in Watchlist. removing...")
-            api.remove_from_watchlist(watchlist)
-        else:
-            print("Watchlist is empty.")
-            
-        # 2. Ratings
-        print("Fetching Ratings...")
-        ratings = api.get_ratings()
-        if ratings:
-            print(f"Found {len(ratings)} ratings. removing...")
-            api.remove_ratings(ratings)
-        else:
-            print("No ratings found.")
-            
-        # 3. History
-        print("Fetching History...")
-        history = api.get_history()
-        # History is a list of objects, we need to handle pagination potentially, 
-        # but for now we rely on the large limit.
-        if history:
-            print(f"Found {len(history)} history items. removing...")
-            api.remove_history(history)
-        else:
-            print("No history found.")
-            
-        # 4. Lists (Favorites)
-        # Ask for list name again or iterate all? Let's just do Favorites for now as per plan.
-        # But maybe we should search for the list by name?
-        user_lists = api.get_user_lists()
         target_list_name = args.list_name
         if not args.no_input and not args.list_name:
              target_list_name = get_input("Trakt List Name to delete", "Favorites")
-        
         if not target_list_name:
              target_list_name = "Favorites"
-             
-        target_list = next((l for l in user_lists if l['name'] == target_list_name), None)
-        if target_list:
-             print(f"Deleting list '{target_list_name}'...")
-             api.delete_list(target_list['ids']['trakt'])
+
+        print("Proceeding with account cleanup...")
+        remaining = clean_account(api, target_list_name, workers=args.concurrency)
+        left = {collection: count for collection, count in remaining.items() if count}
+        if left:
+            print("Cleanup incomplete, still on Trakt: " + ", ".join(f"{c}={n}" for c, n in left.items()))
         else:
-             print(f"List '{target_list_name}' not found.")
-             
-        print("Cleanup complete.")
-        return
+            print("Cleanup complete.")
+        print_transport_summary(api)
+        write_metrics(api, args)
+        return not left
 
     # 4. Data Directory
-    data_dir = args.data_dir
+    data_dir = get_data_dir(args)
     if not data_dir:
-        default_dir = find_default_data_dir()
-        if not args.no_input:
-            data_dir = get_input("Letterboxd Data Directory", default_dir)
-        else:
-            data_dir = default_dir
-            
-    if not data_dir or not os.path.exists(data_dir):
-        print(f"Error: Data directory '{data_dir}' not found.")
-        return
+        return False
 
     # 5. Likes List Name
-    list_name = args.list_name
-    if args.sync in ['likes', 'all']:
-        if not list_name and not args.no_input:
-            list_name = get_input("Trakt List Name for Likes", "Favorites")
-        if not list_name:
-            list_name = "Favorites"
+    list_name = get_list_name(args)
 
     # Execution
-    if args.sync in ['watchlist', 'all']:
-        path = get_file_path(data_dir, "watchlist.csv")
-        if os.path.exists(path):
-            print(f"Reading {path}...")
-            movies = list(parse_csv(path, 'watchlist'))
-            print(f"Found {len(movies)} movies in watchlist.")
-            api.sync_watchlist(movies)
-        else:
-            print(f"Warning: {path} not found.")
-
-    if args.sync in ['ratings', 'all']:
-        path = get_file_path(data_dir, "ratings.csv")
-        if os.path.exists(path):
-            print(f"Reading {path}...")
-            movies = list(parse_csv(path, 'ratings'))
-            print(f"Found {len(movies)} ratings.")
-            api.sync_ratings(movies)
-        else:
-            print(f"Warning: {path} not found.")
-
-    if args.sync in ['watched', 'all']:
-        path = get_file_path(data_dir, "watched.csv")
-        if os.path.exists(path):
-            print(f"Reading {path}...")
-            movies = list(parse_csv(path, 'watched'))
-            print(f"Found {len(movies)} watched movies.")
-            api.sync_history(movies)
-        else:
-            print(f"Warning: {path} not found.")
+    id_cache = None if args.no_id_cache else IDCache(args.id_cache)
+    # Journals are keyed by account so --resume never skips work done for
+    # another Trakt user from the same directory.
+    account = api.get_username() or c_id
+    if args.resume:
+        print(f"Resuming: chunks already acknowledged for '{account}' will be skipped.")
 
-    if args.sync in ['likes', 'all']:
-        path = get_file_path(data_dir, "likes/films.csv")
-        if os.path.exists(path):
-            print(f"Reading {path}...")
-            movies = list(parse_csv(path, 'likes'))
-            print(f"Found {len(movies)} liked movies.")
-            api.sync_likes_to_list(movies, list_name=list_name)
-        else:
-            print(f"Warning: {path} not found.")
+    # One catalog for the whole run: a film appearing in several exports is
+    # parsed into a single shared entry. --stream keeps its bounded memory by
+    # reading each file straight through instead.
+    catalog = None if args.stream else Catalog(annotate=id_cache.annotate if id_cache else None)
+    watermarks = WatermarkStore(args.watermarks) if args.new_rows_only or args.daemon else None
+    if args.daemon:
+        # Unattended, a changed earlier row makes a cycle read the whole
+        # file again; only the diff keeps that from re-adding every play.
+        if not args.incremental:
+            print("Daemon mode: comparing against Trakt before sending (--incremental).")
+            args.incremental = True
+        run_daemon(lambda export_dir, sync_types: sync_exports(
+            api, args, export_dir, account, list_name, id_cache, catalog, watermarks, sync_types),
+            data_dir, SYNC_FILES, interval=args.interval,
+            wanted=[t for t in SYNC_FILES if args.sync in (t, 'all')])
+        ok = True
+    else:
+        ok = sync_exports(api, args, data_dir, account, list_name, id_cache, catalog, watermarks)
 
-    print("Done!")
+    if catalog is not None and catalog.views:
+        rows = sum(len(view) for view in catalog.views.values())
+        print(f"Catalog: {len(catalog)} distinct films across {rows} rows.")
+    if id_cache:
+        print(f"ID cache: {id_cache.hits} hits, {id_cache.misses} misses "
+              f"({id_cache.hit_rate:.0%} hit rate).")
+        id_cache.close()
+    print_dead_letters(api)
+    print_transport_summary(api)
+    write_metrics(api, args)
+    print("Done!" if ok else "Done, but some sync types failed (see above).")
+    return ok
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
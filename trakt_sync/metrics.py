@@ -0,0 +1,196 @@
+import contextlib
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from .batching import endpoint_key
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# cProfile profiles all threads at once from 3.12 and refuses a second
+# active profiler.
+GLOBAL_PROFILER = sys.version_info >= (3, 12)
+
+# Sections of a Trakt sync response counted per sync type.
+RESULT_SECTIONS = ("added", "updated", "existing", "deleted", "not_found")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; the last bucket is open-ended."""
+
+    def __init__(self, bounds: Iterable[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """
+    Run-wide counters: requests and latency per endpoint, retries and time
+    spent waiting on rate limits, items per sync type by response section, and
+    time per phase (parse, fetch, send, ...). Thread-safe; written out with
+    to_dict() / write_json().
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests: Counter = Counter()
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.retries: Counter = Counter()
+        self.backoff_seconds = 0.0
+        self.items: Dict[str, Counter] = defaultdict(Counter)
+        self.phases: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.rate_limiter = None
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, url: str, status: int, seconds: float):
+        key = f"{method} {endpoint_key(urlparse(url).path)}"
+        with self._lock:
+            self.requests[key] += 1
+            self.statuses[key][str(status)] += 1
+            self.latency[key].observe(seconds * 1000)
+
+    def observe_retry(self, method: str, endpoint: str, delay: float):
+        with self._lock:
+            self.retries[f"{method} {endpoint_key(endpoint)}"] += 1
+            self.backoff_seconds += delay
+
+    def observe_results(self, sync_type: str, responses: Optional[Iterable[Optional[Dict]]]):
+        """Adds up the added/existing/not_found/... sections of sync responses."""
+        counts = Counter()
+        for response in responses or []:
+            for section in RESULT_SECTIONS:
+                for media, value in (response or {}).get(section, {}).items():
+                    counts[f"{section}.{media}"] += len(value) if isinstance(value, list) else value
+        with self._lock:
+            self.items[sync_type].update(counts)
+
+    @contextlib.contextmanager
+    def timer(self, scope: str, phase: str) -> Iterator[None]:
+        """Adds the time spent in the block to `phase` of `scope` (e.g. a sync type)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[scope][phase] += elapsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "started_at": self.started_at,
+                "seconds": time.time() - self.started_at,
+                "requests": dict(self.requests),
+                "statuses": {key: dict(counts) for key, counts in self.statuses.items()},
+                "latency_ms": {key: hist.to_dict() for key, hist in self.latency.items()},
+                "retries": dict(self.retries),
+                "backoff_seconds": self.backoff_seconds,
+                "items": {key: dict(counts) for key, counts in self.items.items()},
+                "phases": {key: dict(times) for key, times in self.phases.items()},
+            }
+        if self.rate_limiter is not None:
+            data["rate_limit_wait_seconds"] = self.rate_limiter.waited
+            data["throttled"] = self.rate_limiter.throttled
+        return data
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
+
+class RunProfiler:
+    """
+    cProfile over the whole run, worker threads included. From Python 3.12
+    cProfile is built on sys.monitoring, so the one profiler sees every
+    thread (and only one may be active; cumulative times of calls in worker
+    threads are then approximate). Before that each thread started
+    while it is active gets its own profiler, merged when the dump is written.
+    """
+
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _start_thread(self, *args):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.threads.append(profile)
+        # Replaces this hook for the rest of the thread.
+        profile.enable()
+
+    def start(self):
+        if not GLOBAL_PROFILER:
+            threading.setprofile(self._start_thread)
+        self.main.enable()
+
+    def stop(self, path: str):
+        self.main.disable()
+        if not GLOBAL_PROFILER:
+            threading.setprofile(None)
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for profile in self.threads:
+                try:
+                    stats.add(profile)
+                except TypeError:
+                    # Thread that never reached any profiled call.
+                    continue
+        stats.dump_stats(path)
+
+
+@contextlib.contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """Profiles the block into a cProfile dump at `path`; a no-op without one."""
+    if not path:
+        yield
+        return
+    profiler = RunProfiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop(path)
+        print(f"Profile written to {path} (inspect with: python3 -m pstats {path}).")
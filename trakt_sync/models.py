@@ -1,10 +1,35 @@
-from dataclasses import dataclass
-from typing import Optional
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
 
-@dataclass
+# Slotted instances have no per-instance __dict__, which roughly halves the
+# memory of a parsed export. dataclass only accepts slots= from Python 3.10.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class Movie:
     title: str
     year: int
     uri: str
     rating: Optional[float] = None
     watched_at: Optional[str] = None
+    ids: Optional[Dict[str, Any]] = None
+
+@dataclass
+class MovieBatch:
+    """
+    Column-oriented rows of one export: one list per field instead of one
+    object per row. Cheap to build in bulk and to turn into payload items.
+    """
+    titles: List[str] = field(default_factory=list)
+    years: List[int] = field(default_factory=list)
+    uris: List[str] = field(default_factory=list)
+    ratings: List[Optional[float]] = field(default_factory=list)
+    watched_at: List[Optional[str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __iter__(self) -> Iterator[Movie]:
+        for row in zip(self.titles, self.years, self.uris, self.ratings, self.watched_at):
+            yield Movie(*row)
@@ -1,37 +1,147 @@
+import contextlib
 import csv
-from typing import List, Generator
-from .models import Movie
+import io
+from typing import BinaryIO, Generator, Iterable, List, Optional, Union
+from .models import Movie, MovieBatch
+from .watermark import HashingReader, Watermark
 
-def parse_csv(filepath: str, file_type: str = 'watchlist') -> Generator[Movie, None, None]:
+# A file path, or an already open binary stream such as a zip member.
+CsvSource = Union[str, BinaryIO]
+
+def _iter_rows(reader: Iterable[List[str]], header: List[str], file_type: str):
+    """
+    Yields (title, year, uri, rating, watched_at) tuples. Column lookups and
+    the file_type dispatch happen once here, outside the per-row loops.
+    """
+    columns = {name: i for i, name in enumerate(header)}
+    if 'Name' not in columns or 'Year' not in columns:
+        return
+    # A column missing from the header points one past its end; rows shorter
+    # than the furthest column used are padded with empty cells.
+    missing = len(header)
+    name_i = columns['Name']
+    year_i = columns['Year']
+    uri_i = columns.get('Letterboxd URI', missing)
+    rating_i = columns.get('Rating', missing)
+    date_i = columns.get('Date', missing)
+    width = max(name_i, year_i, uri_i, rating_i, date_i) + 1
+
+    if file_type == 'ratings':
+        for row in reader:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            if not row[name_i] or not row[year_i]:
+                continue
+            rating = row[rating_i]
+            yield (row[name_i], int(row[year_i]), row[uri_i],
+                   float(rating) if rating else None, row[date_i] or None)
+    elif file_type == 'watched':
+        for row in reader:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            if not row[name_i] or not row[year_i]:
+                continue
+            yield row[name_i], int(row[year_i]), row[uri_i], None, row[date_i] or None
+    else:
+        for row in reader:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            if not row[name_i] or not row[year_i]:
+                continue
+            yield row[name_i], int(row[year_i]), row[uri_i], None, None
+
+def _open_binary(stack: contextlib.ExitStack, source: CsvSource, rewind: bool = False) -> BinaryIO:
+    if isinstance(source, str):
+        return stack.enter_context(open(source, 'rb'))
+    # A caller's stream (e.g. a zip member) stays open; it is theirs to close.
+    if rewind:
+        source.seek(0)
+    return source
+
+@contextlib.contextmanager
+def _open_csv(source: CsvSource, watermark: Optional[Watermark] = None):
+    """
+    Opens an export for csv.reader and yields (reader, header). `source` is
+    a file path or an open binary stream.
+
+    With a watermark whose bytes are still the start of the file, the reader
+    starts right after them, so only rows added since are parsed. The file is
+    still read sequentially to check that prefix, and once the caller has
+    read to the end the watermark is moved to cover the whole file.
+    """
+    if watermark is None:
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8', newline='') as csvfile:
+                reader = csv.reader(csvfile)
+                yield reader, next(reader, None)
+            return
+        text = io.TextIOWrapper(source, encoding='utf-8', newline='')
+        try:
+            reader = csv.reader(text)
+            yield reader, next(reader, None)
+        finally:
+            text.detach()
+        return
+
+    header = None
+    watermark.tail_only = False
+    with contextlib.ExitStack() as stack:
+        raw = HashingReader(_open_binary(stack, source))
+        if watermark.size and watermark.header and raw.skip(watermark.size) == watermark.digest:
+            header = watermark.header
+            watermark.tail_only = True
+        else:
+            # Earlier content changed (or first run): read it all again.
+            stack.close()
+            raw = HashingReader(_open_binary(stack, source, rewind=raw.position > 0))
+        reader = csv.reader(io.TextIOWrapper(io.BufferedReader(raw), encoding='utf-8', newline=''))
+        if header is None:
+            header = next(reader, None)
+        yield reader, header
+        watermark.advance(raw.position, raw.digest.hexdigest(), header)
+
+def parse_csv(filepath: CsvSource, file_type: str = 'watchlist',
+              watermark: Optional[Watermark] = None) -> Generator[Movie, None, None]:
     """
     Parses a Letterboxd export CSV file and yields Movie objects.
     
     Args:
-        filepath: Path to the CSV file.
+        filepath: Path to the CSV file, or the file opened in binary mode.
         file_type: Type of export ('watchlist', 'ratings', 'watched', 'likes').
+        watermark: Only yield rows past it, and move it to the end of the
+            file once everything was read.
         
     Yields:
         Movie objects.
     """
-    with open(filepath, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            if not row.get('Name') or not row.get('Year'):
-                continue
-                
-            title = row['Name']
-            year = int(row['Year'])
-            uri = row['Letterboxd URI']
-            
-            movie = Movie(title=title, year=year, uri=uri)
-            
-            if file_type == 'ratings':
-                if row.get('Rating'):
-                    movie.rating = float(row['Rating'])
-                if row.get('Date'):
-                    movie.watched_at = row['Date']
-            
-            if file_type == 'watched' and row.get('Date'):
-                movie.watched_at = row['Date'] # Format is YYYY-MM-DD which Trakt accepts
-                
-            yield movie
+    with _open_csv(filepath, watermark) as (reader, header):
+        if header is None:
+            return
+        for row in _iter_rows(reader, header, file_type):
+            yield Movie(*row)
+
+def parse_csv_columns(filepath: CsvSource, file_type: str = 'watchlist',
+                      watermark: Optional[Watermark] = None) -> MovieBatch:
+    """
+    Parses a Letterboxd export CSV file into a single columnar MovieBatch,
+    avoiding a Movie object per row when payloads are built in bulk.
+
+    Args:
+        filepath: Path to the CSV file, or the file opened in binary mode.
+        file_type: Type of export ('watchlist', 'ratings', 'watched', 'likes').
+        watermark: As for parse_csv.
+
+    Returns:
+        A MovieBatch holding every row.
+    """
+    batch = MovieBatch()
+    with _open_csv(filepath, watermark) as (reader, header):
+        if header is None:
+            return batch
+        for title, year, uri, rating, watched_at in _iter_rows(reader, header, file_type):
+            batch.titles.append(title)
+            batch.years.append(year)
+            batch.uris.append(uri)
+            batch.ratings.append(rating)
+            batch.watched_at.append(watched_at)
+    return batch
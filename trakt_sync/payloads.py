@@ -0,0 +1,54 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .models import Movie
+
+
+def movie_ref(m: Movie) -> Dict[str, Any]:
+    # Explicit IDs spare Trakt the fuzzy title+year match when we have them.
+    ref = {"title": m.title, "year": m.year}
+    if m.ids:
+        ref["ids"] = m.ids
+    return ref
+
+
+def rating_item(m: Movie) -> Optional[Dict[str, Any]]:
+    if not m.rating:
+        return None
+    return {
+        **movie_ref(m),
+        "rating": int(m.rating * 2),  # Trakt uses 1-10
+        "rated_at": m.watched_at,  # Use watched date as rated date if available approximation
+    }
+
+
+def history_item(m: Movie) -> Optional[Dict[str, Any]]:
+    # Trakt history sync is add-only: each entry is one play.
+    if not m.watched_at:
+        return None
+    return {**movie_ref(m), "watched_at": f"{m.watched_at}T12:00:00.000Z"}
+
+
+# sync type -> builder of one payload item (None to leave the movie out)
+ITEM_BUILDERS = {
+    'watchlist': movie_ref,
+    'ratings': rating_item,
+    'watched': history_item,
+    'likes': movie_ref,
+}
+
+
+def build_payloads(sync_type: str, chunks: Iterable[List[Movie]]) -> Iterator[Dict[str, List[Dict]]]:
+    """Turns chunks of movies into request bodies for `sync_type`."""
+    make = ITEM_BUILDERS[sync_type]
+    for chunk in chunks:
+        yield {"movies": [item for item in map(make, chunk) if item is not None]}
+
+
+def fixed_chunks(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
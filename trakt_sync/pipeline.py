@@ -0,0 +1,82 @@
+import queue
+import threading
+from typing import Callable, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def prefetch(iterable: Iterable[T], maxsize: int = 1000) -> Iterator[T]:
+    """
+    Runs `iterable` in a background thread, handing items over through a
+    bounded queue. The producer (e.g. the CSV parser) keeps working while the
+    consumer builds and sends payloads, and never gets more than `maxsize`
+    items ahead, so memory depends on the queue depth rather than the input.
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    error = []
+
+    def produce():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except BaseException as e:
+            error.append(e)
+        finally:
+            while not stop.is_set():
+                try:
+                    items.put(_DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            yield item
+        if error:
+            raise error[0]
+    finally:
+        stop.set()
+
+
+class Tap(Generic[T]):
+    """
+    Passes items through unchanged while counting them and keeping the ones
+    matching `keep`, so a streamed stage can still report totals afterwards.
+    With a `limit`, only the first `limit` matches are kept and the rest are
+    just counted in `overflow`.
+    """
+
+    def __init__(self, iterable: Iterable[T], keep: Optional[Callable[[T], bool]] = None,
+                 limit: Optional[int] = None):
+        self.iterable = iterable
+        self.keep = keep
+        self.limit = limit
+        self.count = 0
+        self.overflow = 0
+        self.kept: List[T] = []
+
+    def __iter__(self) -> Iterator[T]:
+        for item in self.iterable:
+            self.count += 1
+            if self.keep is not None and self.keep(item):
+                if self.limit is None or len(self.kept) < self.limit:
+                    self.kept.append(item)
+                else:
+                    self.overflow += 1
+            yield item
@@ -0,0 +1,165 @@
+import gzip
+import hashlib
+import json
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .api import TraktAPI
+from .batching import DEFAULT_CAPS, endpoint_key
+from .catalog import Catalog
+from .payloads import ITEM_BUILDERS, fixed_chunks
+from .source import ExportSource
+
+PLAN_VERSION = 1
+
+# The likes list only gets its ID once apply finds or creates it.
+LIST_ITEMS_ENDPOINT = "/users/me/lists/{list_id}/items"
+
+# sync type -> (endpoint, progress label)
+PLAN_ENDPOINTS = {
+    'watchlist': ("/sync/watchlist", "Syncing watchlist"),
+    'ratings': ("/sync/ratings", "Syncing ratings"),
+    'watched': ("/sync/history", "Syncing history"),
+    'likes': (LIST_ITEMS_ENDPOINT, "Syncing likes"),
+}
+
+
+def manifest_path(path: str) -> str:
+    return f"{path}.manifest.json"
+
+
+def encode(payload: Dict[str, Any]) -> bytes:
+    """The exact request body sent for `payload`."""
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def write_plan(path: str, source: ExportSource, files: Dict[str, str], catalog: Catalog,
+               list_name: Optional[str] = None, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Builds every request body for the given exports without touching the
+    network and writes them to `path`: gzip-compressed NDJSON, one compact
+    body per line, grouped by sync type. A manifest next to it records the
+    endpoint, chunk and item counts and a SHA-256 of each section's lines.
+
+    Args:
+        path: Plan file to write.
+        source: Export to read.
+        files: sync type -> file name inside the export, for the types to plan.
+        catalog: Parses the files; annotates them with cached Trakt IDs.
+        list_name: Trakt list the likes go to.
+        chunk_size: Items per request; the endpoint's default cap otherwise.
+
+    Returns:
+        The manifest.
+    """
+    sections = []
+    with gzip.open(path, "wb") as out:
+        for sync_type, name in files.items():
+            endpoint, label = PLAN_ENDPOINTS[sync_type]
+            with source.open(name) as stream:
+                movies = catalog.load(stream, sync_type)
+            make = ITEM_BUILDERS[sync_type]
+            items = (item for item in map(make, movies) if item is not None)
+            size = chunk_size or DEFAULT_CAPS[endpoint_key(endpoint.format(list_id=0))]
+            digest = hashlib.sha256()
+            chunks = count = 0
+            for chunk in fixed_chunks(items, size):
+                line = encode({"movies": chunk}) + b"\n"
+                out.write(line)
+                digest.update(line)
+                chunks += 1
+                count += len(chunk)
+            print(f"Planned {sync_type}: {count} items in {chunks} chunks.")
+            sections.append({
+                "sync_type": sync_type,
+                "endpoint": endpoint,
+                "label": label,
+                "chunks": chunks,
+                "items": count,
+                "sha256": digest.hexdigest(),
+            })
+
+    manifest = {
+        "version": PLAN_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source": source.location,
+        "list_name": list_name,
+        "sections": sections,
+    }
+    with open(manifest_path(path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    with open(manifest_path(path), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != PLAN_VERSION:
+        raise ValueError(f"Unsupported plan version {manifest.get('version')} in {manifest_path(path)}")
+    return manifest
+
+
+def verify_plan(path: str, manifest: Dict[str, Any]):
+    """Checks every section against its manifest hash; raises ValueError on a mismatch."""
+    with gzip.open(path, "rb") as f:
+        for section in manifest["sections"]:
+            digest = hashlib.sha256()
+            lines = 0
+            for line in islice(f, section["chunks"]):
+                digest.update(line)
+                lines += 1
+            if lines != section["chunks"] or digest.hexdigest() != section["sha256"]:
+                raise ValueError(f"Plan {path} doesn't match its manifest in the {section['sync_type']} section")
+        if f.readline():
+            raise ValueError(f"Plan {path} has more lines than its manifest lists")
+
+
+def _bodies(f: Iterable[bytes], count: int) -> Iterator[bytes]:
+    for line in islice(f, count):
+        yield line.rstrip(b"\n")
+
+
+def apply_plan(api: TraktAPI, path: str, list_name: Optional[str] = None,
+               sync_types: Optional[List[str]] = None) -> Dict[str, List[Optional[Dict]]]:
+    """
+    Sends a plan written by write_plan. The file is verified against its
+    manifest first, then streamed: each line goes out as the request body
+    as it is, so nothing is parsed or encoded again unless Trakt rejects a
+    chunk and it has to be split.
+
+    Args:
+        api: Session to send with.
+        path: Plan file.
+        list_name: Trakt list for the likes; the one planned for by default.
+        sync_types: Only send these sections.
+
+    Returns:
+        sync type -> responses, in chunk order.
+    """
+    manifest = load_manifest(path)
+    verify_plan(path, manifest)
+    list_name = list_name or manifest.get("list_name") or "Favorites"
+
+    results = {}
+    with gzip.open(path, "rb") as f:
+        for section in manifest["sections"]:
+            sync_type, endpoint, label = section["sync_type"], section["endpoint"], section["label"]
+            bodies = _bodies(f, section["chunks"])
+            if sync_types is not None and sync_type not in sync_types:
+                # Skipped, but still read past to reach the next section.
+                for _ in bodies:
+                    pass
+                continue
+            print(f"Applying {sync_type}: {section['items']} items in {section['chunks']} chunks...")
+            if endpoint == LIST_ITEMS_ENDPOINT:
+                target_list = api.find_or_create_list(list_name)
+                if not target_list:
+                    for _ in bodies:
+                        pass
+                    continue
+                endpoint = endpoint.format(list_id=target_list['ids']['trakt'])
+                label = f"Syncing {list_name}"
+            results[sync_type] = api.send_payloads(endpoint, bodies, label)
+            api.metrics.observe_results(sync_type, results[sync_type])
+    return results
@@ -0,0 +1,187 @@
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Trakt's published limits for authenticated apps: writes (POST/PUT/DELETE)
+# are limited to one call per second, reads to 1000 calls per 5 minutes.
+DEFAULT_LIMITS = {
+    "write": (1, 1.0),
+    "read": (1000, 300.0),
+}
+
+WRITE_METHODS = ("POST", "PUT", "DELETE")
+
+
+def endpoint_class(method: str) -> str:
+    return "write" if method.upper() in WRITE_METHODS else "read"
+
+
+# Most tokens a bucket saves up, however high the advertised limit.
+MAX_BURST = 10.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at limit/period per second up to `burst`.
+    acquire() reserves a token and sleeps until it is due, so concurrent
+    callers are spaced out instead of all waking at once. When the limits
+    change or the bucket is paused, sleeping callers hand their reservation
+    back and queue again at the new pace, so requests queued under the
+    conservative defaults don't keep waiting once Trakt advertises more.
+    """
+
+    def __init__(self, limit: int, period: float, burst: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.rate = limit / period
+        self.burst = burst if burst is not None else min(float(limit), MAX_BURST)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        # Bumped whenever waits computed so far are no longer right.
+        self.generation = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _reschedule(self):
+        self.generation += 1
+        self._changed.notify_all()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        start = time.monotonic()
+        slept = False
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                self.tokens -= 1
+                wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+                wait = max(wait, self.paused_until - now)
+                if wait <= 0:
+                    break
+                slept = True
+                generation = self.generation
+                if not self._changed.wait_for(lambda: self.generation != generation, timeout=wait):
+                    break
+                self.tokens += 1
+        return time.monotonic() - start if slept else 0.0
+
+    def set_limit(self, limit: int, period: float):
+        if not limit:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            rate, burst = limit / period, min(float(limit), MAX_BURST)
+            if (rate, burst) != (self.rate, self.burst):
+                self.rate, self.burst = rate, burst
+                self._reschedule()
+
+    def set_remaining(self, remaining: int):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(remaining))
+
+    def pause(self, seconds: float):
+        """Hold back every caller of this bucket for `seconds`."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self.paused_until:
+                self.paused_until = until
+                self._reschedule()
+
+
+class RateLimiter:
+    """
+    Paces requests per endpoint class ('write' for POST/PUT/DELETE, 'read' for
+    GET) using token buckets, and keeps them in sync with the X-Ratelimit and
+    Retry-After headers Trakt sends back.
+
+    Args:
+        limits: Mapping of endpoint class to (limit, period seconds).
+        max_backoff: Upper bound for a single backoff sleep, in seconds.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None, max_backoff: float = 60.0):
+        limits = limits or DEFAULT_LIMITS
+        self.buckets = {name: TokenBucket(limit, period) for name, (limit, period) in limits.items()}
+        self.max_backoff = max_backoff
+        self.waited = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, method: str) -> float:
+        waited = self.buckets[endpoint_class(method)].acquire()
+        with self._lock:
+            self.waited += waited
+        return waited
+
+    def observe(self, method: str, response):
+        """Adjust the bucket for `method` from the response's rate limit headers."""
+        header = response.headers.get("X-Ratelimit")
+        if not header:
+            return
+        try:
+            info = json.loads(header)
+        except ValueError:
+            return
+        bucket = self.buckets[endpoint_class(method)]
+        if info.get("limit") and info.get("period"):
+            bucket.set_limit(int(info["limit"]), float(info["period"]))
+        if info.get("remaining") is not None:
+            bucket.set_remaining(int(info["remaining"]))
+            if int(info["remaining"]) <= 0 and info.get("until"):
+                reset_in = _parse_timestamp(info["until"])
+                if reset_in:
+                    bucket.pause(min(reset_in, self.max_backoff))
+
+    def backoff(self, method: str, response, attempt: int) -> float:
+        """
+        Pause the endpoint class after a 429 and return the delay applied.
+
+        Honors Retry-After when present (plus a little jitter so concurrent
+        workers don't retry in lockstep); otherwise falls back to exponential
+        backoff with full jitter.
+        """
+        with self._lock:
+            self.throttled += 1
+        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, 0.25 + retry_after * 0.1)
+        else:
+            delay = random.uniform(0, min(self.max_backoff, 2.0 ** attempt))
+        delay = min(delay, self.max_backoff)
+        self.buckets[endpoint_class(method)].pause(delay)
+        return delay
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # HTTP-date form
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+def _parse_timestamp(value: str) -> Optional[float]:
+    """Seconds from now until an ISO 8601 timestamp such as '2020-10-10T00:24:00Z'."""
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, moment.timestamp() - time.time())
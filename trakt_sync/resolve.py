@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from .api import TraktAPI
+from .cache import IDCache, not_found_keys
+from .diff import title_key
+from .models import Movie
+
+
+def best_match(movie: Movie, results: List[Dict]) -> Optional[Dict]:
+    """
+    Picks the search result for `movie`: the one result whose normalized
+    title and year match, or the only result Trakt returned if it is from
+    the same year. Anything else (no match, or several films sharing the title) is
+    too uncertain to send, so the movie stays not found.
+    """
+    candidates = [r["movie"] for r in results if r.get("movie")]
+    if movie.year:
+        same_year = [c for c in candidates if c.get("year") == movie.year]
+    else:
+        same_year = candidates
+    key = title_key(movie.title, movie.year)
+    exact = {}
+    for candidate in same_year:
+        if title_key(candidate.get("title") or "", candidate.get("year") if movie.year else None) == key:
+            ids = candidate.get("ids") or {}
+            exact.setdefault(ids.get("trakt") or id(candidate), candidate)
+    if exact:
+        return next(iter(exact.values())) if len(exact) == 1 else None
+    if movie.year and len(candidates) == 1 and same_year:
+        return same_year[0]
+    return None
+
+
+def resolve_not_found(api: TraktAPI, movies: Iterable[Movie], responses: Optional[List[Optional[Dict]]],
+                      id_cache: Optional[IDCache] = None, workers: int = 4) -> List[Movie]:
+    """
+    Looks up the movies Trakt reported as not_found with its search endpoint.
+
+    Searches run `workers` at a time under the API's read rate limit, once
+    per distinct title and year. With a cache, every answer is stored: IDs
+    for matches and a negative entry otherwise, and titles already known to
+    be unmatched are not searched again. Returns the matched movies with
+    their IDs filled in, ready to be sent once more.
+    """
+    missing = not_found_keys(responses)
+    if not missing:
+        return []
+    candidates: Dict[str, List[Movie]] = {}
+    for movie in movies:
+        key = title_key(movie.title, movie.year)
+        if movie.ids or key not in missing:
+            continue
+        if id_cache and movie.uri and id_cache.is_not_found(movie.uri):
+            continue
+        candidates.setdefault(key, []).append(movie)
+    if not candidates:
+        return []
+
+    print(f"Searching Trakt for {len(candidates)} unmatched titles...")
+
+    def search(group: List[Movie]):
+        # A failed lookup is not cached: it says nothing about the title.
+        try:
+            results = api.search_movie(group[0].title, group[0].year)
+        except requests.exceptions.RequestException as e:
+            print(f"Search for '{group[0].title}' failed: {e}")
+            return False, None
+        if results is None:
+            return False, None
+        return True, best_match(group[0], results)
+
+    groups = list(candidates.values())
+    matched = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for group, (searched, match) in zip(groups, executor.map(search, groups)):
+            for movie in group:
+                if match and match.get("ids"):
+                    movie.ids = match["ids"]
+                    matched.append(movie)
+                    if id_cache and movie.uri:
+                        id_cache.put(movie.uri, match["ids"], movie.title, movie.year)
+                elif searched and id_cache and movie.uri:
+                    id_cache.put_not_found(movie.uri, movie.title, movie.year)
+    if id_cache:
+        id_cache.flush()
+    print(f"Matched {len(matched)} of {sum(len(g) for g in groups)} unmatched items by search.")
+    return matched
@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .batching import endpoint_key
+
+# Lower runs first when chunks of several endpoints are waiting. The small
+# collections finish early; history, usually the largest, fills the rest.
+DEFAULT_PRIORITIES = {
+    "/sync/ratings": 0,
+    "/sync/watchlist": 1,
+    "/users/me/lists/*/items": 2,
+    "/sync/history": 3,
+}
+
+
+class SchedulerClosed(RuntimeError):
+    """Raised by Scheduler.submit() once the run was stopped or closed."""
+
+
+class Scheduler:
+    """
+    Run-level queue of chunk requests from every sync phase.
+
+    Phases submit chunks as they produce them and a fixed set of workers
+    sends them, highest priority endpoint first and in submission order
+    within an endpoint. All requests still go through the API's one rate
+    limiter, so the phases share a single budget and the writes keep going
+    while another phase is parsing or fetching.
+
+    Args:
+        workers: Requests kept in flight across all phases.
+        priorities: Endpoint -> priority, lower first; endpoints not listed
+            go after the listed ones.
+    """
+
+    def __init__(self, workers: int = 1, priorities: Optional[Dict[str, int]] = None):
+        self.priorities = priorities or DEFAULT_PRIORITIES
+        self.queued = 0
+        self.done = 0
+        self.items_done = 0
+        self.started_at = time.monotonic()
+        self._heap: List[Tuple[int, int, Future, Callable, tuple, str, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stopped = False
+        self._threads = [threading.Thread(target=self._work, name=f"scheduler-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, endpoint: str, label: str, items: int, fn: Callable, *args: Any) -> Future:
+        """Queues fn(*args) as one chunk of `items` items for `endpoint`."""
+        future = Future()
+        priority = self.priorities.get(endpoint_key(endpoint), len(self.priorities))
+        with self._cond:
+            if self._closed or self.stopped:
+                raise SchedulerClosed(f"not queuing {label}: the run is stopping")
+            self.queued += 1
+            heapq.heappush(self._heap, (priority, next(self._seq), future, fn, args, label, items))
+            self._cond.notify()
+        return future
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                _, _, future, fn, args, label, items = heapq.heappop(self._heap)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            with self._cond:
+                self.done += 1
+                self.items_done += items
+                done, queued, sent = self.done, self.queued, self.items_done
+            print(f"[{done}/{queued} chunks, {sent} items] {label} done.")
+
+    def close(self):
+        """Lets the workers drain the queue, then stops them."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def cancel_pending(self):
+        """Drops the chunks not started yet, e.g. once the run is failing."""
+        with self._cond:
+            pending, self._heap = self._heap, []
+        for entry in pending:
+            entry[2].cancel()
+
+    def stop(self):
+        """
+        Stops the run early (Ctrl-C, or a phase failing): queued chunks are
+        dropped and submit() refuses new ones, so the phases still producing
+        end at their next chunk instead of sending the rest of their files.
+        Chunks already being sent are finished.
+        """
+        with self._cond:
+            self.stopped = True
+        self.cancel_pending()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.done,
+            "items": self.items_done,
+            "seconds": time.monotonic() - self.started_at,
+        }
+
+    def __enter__(self) -> "Scheduler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.stop()
+        self.close()
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import zipfile
+from typing import BinaryIO, Optional, Tuple
+
+
+def is_export(path: str) -> bool:
+    """A Letterboxd export: an extracted directory or the original zip."""
+    return os.path.isdir(path) or (os.path.isfile(path) and zipfile.is_zipfile(path))
+
+
+class ExportSource:
+    """
+    The files of one Letterboxd export, read either from an extracted
+    directory or straight from the downloaded zip without extracting it.
+    Files are named as inside the export, e.g. "likes/films.csv".
+    """
+
+    def __init__(self, location: str):
+        self.location = location
+        self.archive: Optional[zipfile.ZipFile] = None
+        self._members = {}
+        if not os.path.isdir(location):
+            self.archive = zipfile.ZipFile(location)
+            for info in self.archive.infolist():
+                if not info.is_dir():
+                    self._members[info.filename] = info
+            # Some tools re-zip the extracted folder: accept one top-level
+            # directory around the files as well.
+            roots = {name.split("/", 1)[0] for name in self._members}
+            if len(roots) == 1 and all("/" in name for name in self._members):
+                root = roots.pop() + "/"
+                self._members = {name[len(root):]: info for name, info in self._members.items()}
+
+    @property
+    def is_zip(self) -> bool:
+        return self.archive is not None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.location, *name.split("/"))
+
+    def exists(self, name: str) -> bool:
+        if self.archive is not None:
+            return name in self._members
+        return os.path.exists(self._path(name))
+
+    def describe(self, name: str) -> str:
+        """Where `name` lives, for messages and journal keys."""
+        if self.archive is not None:
+            return f"{self.location}!{name}"
+        return self._path(name)
+
+    def open(self, name: str) -> BinaryIO:
+        """Opens `name` for binary reading; zip members are decompressed as they are read."""
+        if self.archive is not None:
+            return self.archive.open(self._members[name])
+        return open(self._path(name), "rb")
+
+    def stat(self, name: str) -> Tuple[float, int]:
+        """(mtime, size) of `name`, cheap to compare between checks."""
+        if self.archive is not None:
+            info = self._members[name]
+            return os.path.getmtime(self.location), info.file_size
+        st = os.stat(self._path(name))
+        return st.st_mtime, st.st_size
+
+    def fingerprint(self, name: str) -> str:
+        """Content hash of `name`; for zip members the CRC the archive already stores."""
+        if self.archive is not None:
+            info = self._members[name]
+            return f"crc32:{info.CRC:08x}:{info.file_size}"
+        digest = hashlib.sha256()
+        with self.open(name) as f:
+            for data in iter(lambda: f.read(1 << 20), b""):
+                digest.update(data)
+        return digest.hexdigest()
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+
+    def __enter__(self) -> "ExportSource":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+@dataclass
+class RequestTiming:
+    method: str
+    url: str
+    status: int
+    elapsed: float  # request sent -> response headers parsed
+    total: float  # wall-clock including connection setup and body download
+    new_connection: bool
+
+
+class Transport:
+    """
+    Shared, pooled HTTP transport used by TraktAPI.
+
+    All requests go through a single requests.Session so TCP connections and
+    TLS sessions are kept alive and reused across chunks instead of being
+    re-established for every call.
+
+    Args:
+        headers: Default headers sent with every request.
+        pool_size: Maximum number of pooled connections per host.
+        timeout: Default (connect, read) timeout in seconds.
+        keep_alive: Whether to ask the server to keep connections open.
+        max_timings: Number of recent request timings kept for reporting.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, pool_size: int = 10,
+                 timeout: Timeout = (5.0, 60.0), keep_alive: bool = True,
+                 max_timings: int = 10000):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self.session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+        self.timings = deque(maxlen=max_timings)
+        self.request_count = 0
+        self.connections_opened = 0
+        # Optional Metrics sink, set by TraktAPI.
+        self.metrics = None
+        self._lock = threading.Lock()
+
+    def _pool_connections(self) -> int:
+        # urllib3 counts every new connection a pool opens; comparing the total
+        # before and after a request tells us whether an idle one was reused.
+        pools = self.adapter.poolmanager.pools
+        total = 0
+        for key in pools.keys():
+            try:
+                total += pools[key].num_connections
+            except KeyError:
+                pass
+        return total
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        opened_before = self._pool_connections()
+        start = time.perf_counter()
+        response = self.session.request(method, url, **kwargs)
+        total = time.perf_counter() - start
+        # Under concurrency another request may open a connection in between,
+        # so this per-request flag (and the new vs reused averages) is an
+        # approximation. The connection total is read from the pools instead.
+        opened = self._pool_connections()
+        new_connection = opened > opened_before
+
+        with self._lock:
+            self.request_count += 1
+            self.connections_opened = max(self.connections_opened, opened)
+            self.timings.append(RequestTiming(
+                method=method,
+                url=url,
+                status=response.status_code,
+                elapsed=response.elapsed.total_seconds(),
+                total=total,
+                new_connection=new_connection,
+            ))
+        if self.metrics is not None:
+            self.metrics.observe_request(method, url, response.status_code, total)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def summary(self) -> Dict[str, float]:
+        """Aggregate timings, split by fresh vs reused connections."""
+        with self._lock:
+            timings = list(self.timings)
+            stats = {
+                "requests": self.request_count,
+                "connections_opened": self.connections_opened,
+            }
+        fresh = [t.total for t in timings if t.new_connection]
+        reused = [t.total for t in timings if not t.new_connection]
+        stats["avg_new_connection_ms"] = 1000 * sum(fresh) / len(fresh) if fresh else 0.0
+        stats["avg_reused_connection_ms"] = 1000 * sum(reused) / len(reused) if reused else 0.0
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,100 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+WATERMARK_FILE = ".trakt_watermarks.json"
+
+
+class HashingReader(io.RawIOBase):
+    """Read-only stream that hashes every byte read through it."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self.digest.update(data)
+        self.position += n
+        return n
+
+    def skip(self, size: int, block: int = 1 << 20) -> str:
+        """Reads and hashes the next `size` bytes, returning the digest so far."""
+        while size > 0:
+            data = self.raw.read(min(block, size))
+            if not data:
+                break
+            self.digest.update(data)
+            self.position += len(data)
+            size -= len(data)
+        return self.digest.hexdigest()
+
+
+@dataclass
+class Watermark:
+    """
+    How far one export file was read on the last run: the byte size and
+    SHA-256 of the content read then, and its header row. Letterboxd exports
+    only grow at the end, so a new export starting with exactly those bytes
+    only needs its remainder read.
+    """
+    size: int = 0
+    digest: str = ""
+    header: Optional[List[str]] = None
+    updated_at: float = 0.0
+    # Set by the parser on each read: whether only the new tail was read.
+    tail_only: bool = field(default=False, compare=False)
+
+    def advance(self, size: int, digest: str, header: Optional[List[str]]):
+        self.size = size
+        self.digest = digest
+        self.header = header
+        self.updated_at = time.time()
+
+
+class WatermarkStore:
+    """
+    Watermarks per account and export file, kept in one JSON file. Files are
+    keyed by their name inside the export (e.g. "watched.csv"), so the
+    watermark carries over to next week's export in a new directory.
+    """
+
+    def __init__(self, path: str = WATERMARK_FILE):
+        self.path = path
+        self.marks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.marks = json.load(f)
+            except ValueError:
+                self.marks = {}
+
+    @staticmethod
+    def _key(account: str, name: str) -> str:
+        return f"{account}|{name}"
+
+    def get(self, account: str, name: str) -> Watermark:
+        data = self.marks.get(self._key(account, name))
+        return Watermark(**data) if data else Watermark()
+
+    def put(self, account: str, name: str, watermark: Watermark):
+        data = asdict(watermark)
+        data.pop("tail_only")
+        with self._lock:
+            self.marks[self._key(account, name)] = data
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.marks, f, indent=1)
+            os.replace(tmp, self.path)